@@ -5,10 +5,12 @@ Added comprehensive Java version verification to ensure proper configuration.
 """
 
 import docker
+from docker.constants import DEFAULT_MAX_POOL_SIZE
 import logging
 import os
 import tempfile
-from typing import Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -19,10 +21,17 @@ class AndroidContainerManager:
     
     BASE_IMAGE = "mingc/android-build-box:latest"
     
-    def __init__(self):
-        self.client = docker.from_env()
+    def __init__(self, max_pool_size: int = DEFAULT_MAX_POOL_SIZE):
+        # Every worker thread shares this client, so its HTTP connection pool
+        # must be large enough that exec calls do not queue for a connection
+        self.client = docker.from_env(max_pool_size=max_pool_size)
         self.containers = {}
-        self._ensure_base_image()
+        
+        # Pull the base image in the background so dataset loading overlaps
+        # with it; create_container waits for it to finish
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-pull")
+        self._base_image_ready = pool.submit(self._ensure_base_image)
+        pool.shutdown(wait=False)
         
     def _ensure_base_image(self):
         """Ensure the base image is available locally."""
@@ -40,6 +49,9 @@ class AndroidContainerManager:
         
         logger.info(f"Creating container for {instance_id} with config: {config}")
         
+        # Re-raises any error from the background image pull
+        self._base_image_ready.result()
+        
         # Build environment variables
         env_vars = self._build_environment_vars(config)
         
@@ -176,7 +188,7 @@ class AndroidContainerManager:
             logger.error(f"❌ JAVA_HOME check FAILED")
         
         # 3. Check which java binary is being used
-        exit_code, which_java_output = self.exec_command(instance_id, "which java")
+        exit_code, which_java_output = self.exec_command(instance_id, ["which", "java"])
         if exit_code == 0:
             java_binary_path = which_java_output.strip()
             logger.info(f"✅ Java binary path: {java_binary_path}")
@@ -184,7 +196,7 @@ class AndroidContainerManager:
             logger.error(f"❌ 'which java' FAILED")
         
         # 4. Check Gradle version and its Java detection
-        exit_code, gradle_version_output = self.exec_command(instance_id, "./gradlew --version")
+        exit_code, gradle_version_output = self.exec_command(instance_id, ["./gradlew", "--version"])
         if exit_code == 0:
             logger.info(f"✅ Gradle version check PASSED:")
             for line in gradle_version_output.strip().split('\n'):
@@ -250,9 +262,14 @@ yes | ${ANDROID_HOME}/cmdline-tools/latest/bin/sdkmanager --licenses 2>/dev/null
         
         logger.info(f"Configured container for {instance_id}")
     
-    def exec_command(self, instance_id: str, command: str, 
+    def exec_command(self, instance_id: str, command: Union[str, List[str]], 
                     workdir: str = "/workspace", user: str = "root") -> tuple[int, str]:
-        """Execute command in container and return exit code and output."""
+        """
+        Execute command in container and return exit code and output.
+        
+        A string is run as a bash script; an argv list is executed directly,
+        skipping the shell process and its quoting.
+        """
         container = self.containers.get(instance_id)
         if not container:
             raise ValueError(f"Container not found for instance: {instance_id}")
@@ -260,8 +277,9 @@ yes | ${ANDROID_HOME}/cmdline-tools/latest/bin/sdkmanager --licenses 2>/dev/null
         try:
             logger.debug(f"Executing in {instance_id}: {command}")
             
+            argv = ["bash", "-c", command] if isinstance(command, str) else command
             exec_result = container.exec_run(
-                ["bash", "-c", command],
+                argv,
                 workdir=workdir,
                 user=user,
                 demux=True,
@@ -320,8 +338,7 @@ yes | ${ANDROID_HOME}/cmdline-tools/latest/bin/sdkmanager --licenses 2>/dev/null
             
             # Create the directory in the container if it doesn't exist
             if dst_dir != '/':
-                mkdir_cmd = f"mkdir -p {dst_dir}"
-                exit_code, output = self.exec_command(instance_id, mkdir_cmd)
+                exit_code, output = self.exec_command(instance_id, ["mkdir", "-p", dst_dir])
                 if exit_code != 0:
                     logger.warning(f"Failed to create directory {dst_dir}: {output}")
             
@@ -337,6 +354,35 @@ yes | ${ANDROID_HOME}/cmdline-tools/latest/bin/sdkmanager --licenses 2>/dev/null
             logger.error(f"Failed to copy file to container {instance_id}: {e}")
             raise
     
+    def copy_content_to_container(self, instance_id: str, content: Union[str, bytes], dst_path: str):
+        """
+        Write content to dst_path in the container.
+        
+        The tar archive is built in memory, so no host file is involved. The
+        destination directory must already exist.
+        """
+        container = self.containers.get(instance_id)
+        if not container:
+            raise ValueError(f"Container not found for instance: {instance_id}")
+        
+        import tarfile
+        import io
+        import time
+        
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        tar_buffer = io.BytesIO()
+        with tarfile.open(fileobj=tar_buffer, mode='w') as tar:
+            info = tarfile.TarInfo(os.path.basename(dst_path))
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+        
+        dst_dir = os.path.dirname(dst_path) or '/'
+        if not container.put_archive(dst_dir, tar_buffer.getvalue()):
+            raise RuntimeError(f"Failed to write {dst_path} in container")
+        
+        logger.debug(f"Wrote {len(data)} bytes to {dst_path} in {instance_id}")
+    
     def copy_from_container(self, instance_id: str, src_path: str, dst_path: str):
         """Copy file from container."""
         container = self.containers.get(instance_id)
@@ -444,8 +490,7 @@ yes | ${ANDROID_HOME}/cmdline-tools/latest/bin/sdkmanager --licenses 2>/dev/null
         
         # Final cleanup: remove any orphaned containers that might be from previous runs
         try:
-            client = docker.from_env()
-            orphaned_containers = client.containers.list(
+            orphaned_containers = self.client.containers.list(
                 all=True, 
                 filters={"name": "android-bench-"}
             )
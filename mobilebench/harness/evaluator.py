@@ -6,24 +6,114 @@ Main evaluation engine for Android-bench.
 import json
 import logging
 import time
-import traceback
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import BinaryIO, Dict, List, Optional, Set
+from dataclasses import dataclass, fields
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Import our modules
 from loader import load_dataset_and_predictions, TaskInstance, ModelPrediction
 from parser import AndroidConfigParser
-from containers import AndroidContainerManager
-from executor import AndroidTestExecutor, TestExecutionResult
+from containers import AndroidContainerManager, DEFAULT_MAX_POOL_SIZE
+from executor import AndroidTestExecutor, TestExecutionResult, TestResult
 from logger import setup_logging, AndroidBenchLogger
 from repository import create_repository_manager
 
 logger = logging.getLogger(__name__)
 
+REPORT_HEADER_TEMPLATE = """Android-Bench Evaluation Report
+========================================
+Run ID: {run_id}
+Total Instances: {total_instances}
+Successful: {successful}
+Failed: {failed}
+Success Rate: {success_rate:.1f}%
+
+Test Statistics:
+--------------------
+Total Tests Run: {total_tests_run}
+Total Tests Passed: {total_tests_passed}
+Total Tests Failed: {total_tests_failed}
+Test Pass Rate: {test_pass_rate:.1f}%
+
+Performance Metrics:
+--------------------
+Average Duration: {avg_duration:.1f}s
+Total Runtime: {total_duration_hours:.2f}h
+
+Failed Instances:
+-----------------
+"""
+
+
+def _dumps(obj) -> bytes:
+    """Compact JSON encoding to bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _dumps_indented(obj) -> bytes:
+    """Two-space indented JSON encoding to bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def _test_result_to_dict(test: TestResult) -> Dict:
+    """Serializable view of a single test result."""
+    return {
+        'test_name': test.test_name,
+        'class_name': test.class_name,
+        'full_name': test.full_name,
+        'status': test.status,
+        'duration': test.duration,
+        'failure_message': test.failure_message,
+        'error_message': test.error_message
+    }
+
+
+def _test_execution_header(te: TestExecutionResult) -> Dict:
+    """Top-level fields of a test execution, without per-test details."""
+    return {
+        'total_tests': te.total_tests,
+        'passed': te.passed,
+        'failed': te.failed,
+        'skipped': te.skipped,
+        'errors': te.errors,
+        'duration': te.duration,
+        'exit_code': te.exit_code,
+        'build_successful': te.build_successful,
+        'passed_tests': te.get_passed_tests(),
+        'failed_tests': te.get_failed_tests(),
+        'skipped_tests': te.get_skipped_tests(),
+        'error_tests': te.get_error_tests(),
+    }
+
+
+def encode_test_execution(te: TestExecutionResult, out: BinaryIO):
+    """
+    Stream a test execution as JSON into a binary file.
+    
+    ``detailed_test_results`` is emitted one test at a time, so the full
+    list of per-test dicts is never held in memory.
+    """
+    out.write(_dumps(_test_execution_header(te))[:-1])
+    out.write(b',"detailed_test_results":[')
+    for i, test in enumerate(te.test_results):
+        if i:
+            out.write(b',')
+        out.write(_dumps(_test_result_to_dict(test)))
+    out.write(b']}')
 
-@dataclass
+
+@dataclass(slots=True)
 class EvaluationResult:
     """Complete evaluation result for a single instance."""
     instance_id: str
@@ -45,42 +135,56 @@ class EvaluationResult:
     # Timing
     total_duration: float = 0.0
     
+    def summary_fields(self) -> Dict:
+        """Scalar fields of the result, excluding the test execution."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'test_execution'}
+    
+    def write_json(self, out: BinaryIO):
+        """Stream the result as JSON into a binary file."""
+        out.write(_dumps(self.summary_fields())[:-1])
+        out.write(b',"test_execution":')
+        if self.test_execution:
+            encode_test_execution(self.test_execution, out)
+        else:
+            out.write(b'null')
+        out.write(b'}')
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        result = asdict(self)
+        result = self.summary_fields()
         
         # Handle TestExecutionResult object
         if self.test_execution:
-            result['test_execution'] = {
-                'total_tests': self.test_execution.total_tests,
-                'passed': self.test_execution.passed,
-                'failed': self.test_execution.failed,
-                'skipped': self.test_execution.skipped,
-                'errors': self.test_execution.errors,
-                'duration': self.test_execution.duration,
-                'exit_code': self.test_execution.exit_code,
-                'build_successful': self.test_execution.build_successful,
-                'passed_tests': self.test_execution.get_passed_tests(),
-                'failed_tests': self.test_execution.get_failed_tests(),
-                'skipped_tests': self.test_execution.get_skipped_tests(),
-                'error_tests': self.test_execution.get_error_tests(),
-                'detailed_test_results': [
-                    {
-                        'test_name': test.test_name,
-                        'class_name': test.class_name,
-                        'full_name': f"{test.class_name}.{test.test_name}",
-                        'status': test.status,
-                        'duration': test.duration,
-                        'failure_message': test.failure_message,
-                        'error_message': test.error_message
-                    }
-                    for test in self.test_execution.test_results
-                ]
-            }
+            result['test_execution'] = _test_execution_header(self.test_execution)
+            result['test_execution']['detailed_test_results'] = [
+                _test_result_to_dict(test) for test in self.test_execution.test_results
+            ]
+        else:
+            result['test_execution'] = None
         
         return result
 
 
+def write_summary_with_results(summary: Dict, results: Dict[str, EvaluationResult], out: BinaryIO):
+    """
+    Write ``summary`` with a trailing ``results`` mapping as indented JSON.
+    
+    Each result is converted and encoded on its own, so only one instance's
+    dict is alive at a time; the bytes match encoding the whole mapping at once.
+    """
+    out.write(_dumps_indented(summary)[:-2])  # drop the closing "\n}"
+    if not results:
+        out.write(b',\n  "results": {}\n}')
+        return
+    out.write(b',\n  "results": {')
+    for i, (instance_id, result) in enumerate(results.items()):
+        out.write(b',\n    ' if i else b'\n    ')
+        out.write(_dumps(instance_id))
+        out.write(b': ')
+        out.write(_dumps_indented(result.to_dict()).replace(b'\n', b'\n    '))
+    out.write(b'\n  }\n}')
+
+
 class AndroidBenchEvaluator:
     """Main evaluation engine for Android-bench."""
     
@@ -88,10 +192,23 @@ class AndroidBenchEvaluator:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True, parents=True)
         
-        # Initialize components
-        self.container_manager = AndroidContainerManager()
+        # Directories already created during this run
+        self._mkdir_cache: Set[Path] = {self.output_dir}
+        
+        # Initialize components (the container manager is created by _start_docker)
         self.repo_manager = create_repository_manager()
         self.logger_manager = None
+        self.container_manager: Optional[AndroidContainerManager] = None
+        self._max_workers = 1
+    
+    def _start_docker(self) -> AndroidContainerManager:
+        """Create the Docker container manager on first call and return it."""
+        if self.container_manager is None:
+            # A few connections per worker: exec calls, log reads and cleanup overlap
+            self.container_manager = AndroidContainerManager(
+                max_pool_size=max(DEFAULT_MAX_POOL_SIZE, self._max_workers * 4)
+            )
+        return self.container_manager
         
     def evaluate_dataset(
         self,
@@ -107,6 +224,8 @@ class AndroidBenchEvaluator:
         
         # Setup logging
         self.logger_manager = setup_logging(str(self.output_dir), run_id, log_level)
+        self._ensure_dir(self.output_dir / run_id)
+        self._max_workers = max_workers
         
         results = {}
         
@@ -130,6 +249,11 @@ class AndroidBenchEvaluator:
             
             logger.info(f"Evaluating {len(instances)} instances with {max_workers} workers")
             
+            # Connect to Docker and start the base image pull before any worker
+            # needs it; runs with nothing left to evaluate never touch Docker
+            if instances:
+                self._start_docker()
+            
             if max_workers == 1:
                 # Sequential execution
                 for i, (instance_id, instance) in enumerate(instances.items()):
@@ -138,7 +262,7 @@ class AndroidBenchEvaluator:
                     try:
                         prediction = predictions[instance_id]
                         result = self.evaluate_instance(instance, prediction)
-                        results[instance_id] = result
+                        self._record_result(results, result)
                         
                         # Save intermediate result
                         self._save_instance_result(result)
@@ -147,15 +271,15 @@ class AndroidBenchEvaluator:
                         logger.info(f"{status} {instance_id}: {result.error_message if not result.success else 'Success'}")
                         
                     except Exception as e:
-                        logger.error(f"Failed to evaluate {instance_id}: {e}")
-                        logger.error(traceback.format_exc())
+                        logger.error(f"Failed to evaluate {instance_id}: {e}", exc_info=True)
                         
-                        results[instance_id] = EvaluationResult(
+                        failed_result = EvaluationResult(
                             instance_id=instance_id,
                             model_name=predictions[instance_id].model_name,
-                            success=False,
-                            error_message=str(e)
+                            success=False
                         )
+                        failed_result.error_message = str(e)
+                        self._record_result(results, failed_result)
             else:
                 # Parallel execution
                 results = self._evaluate_parallel(instances, predictions, max_workers)
@@ -164,14 +288,16 @@ class AndroidBenchEvaluator:
             self._save_final_results(results, run_id)
             
         except Exception as e:
-            logger.error(f"Error during dataset evaluation: {e}")
-            logger.error(traceback.format_exc())
+            logger.error(f"Error during dataset evaluation: {e}", exc_info=True)
         
         finally:
             # Cleanup resources
             logger.info("Cleaning up resources...")
-            self.container_manager.cleanup_all()
+            if self.container_manager is not None:
+                self.container_manager.cleanup_all()
             self.repo_manager.cleanup_all()
+            if self.logger_manager:
+                self.logger_manager.close()
         
         return results
     
@@ -181,45 +307,67 @@ class AndroidBenchEvaluator:
         predictions: Dict[str, ModelPrediction],
         max_workers: int
     ) -> Dict[str, EvaluationResult]:
-        """Evaluate instances in parallel."""
+        """Evaluate instances in parallel.
+        
+        At most ``max_workers * 2`` instances are in flight at a time so the
+        pending-future set stays bounded regardless of dataset size.
+        """
         results = {}
+        pending_instances = iter(instances.items())
+        max_in_flight = max_workers * 2
+        completed = 0
+        total = len(instances)
+        
+        # No point starting more threads than there are instances
+        pool_size = max(1, min(max_workers, total))
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_instance = {}
-            for instance_id, instance in instances.items():
-                prediction = predictions[instance_id]
-                future = executor.submit(self.evaluate_instance, instance, prediction)
-                future_to_instance[future] = instance_id
+        with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="mb-eval") as executor:
+            in_flight: Dict[Future, str] = {}
             
-            # Collect results as they complete
-            completed = 0
-            total = len(instances)
+            def submit_next() -> bool:
+                next_item = next(pending_instances, None)
+                if next_item is None:
+                    return False
+                instance_id, instance = next_item
+                future = executor.submit(self.evaluate_instance, instance, predictions[instance_id])
+                in_flight[future] = instance_id
+                return True
             
-            for future in as_completed(future_to_instance):
-                instance_id = future_to_instance[future]
-                completed += 1
+            # Fill the initial window
+            while len(in_flight) < max_in_flight and submit_next():
+                pass
+            
+            # Collect results as they complete, refilling the window
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
                 
-                try:
-                    result = future.result()
-                    results[instance_id] = result
-                    
-                    # Save intermediate result
-                    self._save_instance_result(result)
+                for future in done:
+                    instance_id = in_flight.pop(future)
+                    completed += 1
                     
-                    status = "✓" if result.success else "✗"
-                    logger.info(f"[{completed}/{total}] {status} {instance_id}: {result.error_message if not result.success else 'Success'}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to evaluate {instance_id}: {e}")
-                    logger.error(traceback.format_exc())
-                    
-                    results[instance_id] = EvaluationResult(
-                        instance_id=instance_id,
-                        model_name=predictions[instance_id].model_name,
-                        success=False,
-                        error_message=str(e)
-                    )
+                    try:
+                        result = future.result()
+                        self._record_result(results, result)
+                        
+                        # Save intermediate result
+                        self._save_instance_result(result)
+                        
+                        status = "✓" if result.success else "✗"
+                        logger.info(f"[{completed}/{total}] {status} {instance_id}: {result.error_message if not result.success else 'Success'}")
+                        
+                    except Exception as e:
+                        logger.error(f"Failed to evaluate {instance_id}: {e}", exc_info=True)
+                        
+                        failed_result = EvaluationResult(
+                            instance_id=instance_id,
+                            model_name=predictions[instance_id].model_name,
+                            success=False
+                        )
+                        failed_result.error_message = str(e)
+                        self._record_result(results, failed_result)
+                
+                while len(in_flight) < max_in_flight and submit_next():
+                    pass
         
         return results
     
@@ -232,7 +380,7 @@ class AndroidBenchEvaluator:
             success=False
         )
         
-        start_time = time.time()
+        start_time = time.monotonic()
         repo_path = None
         
         # Setup instance logger
@@ -265,7 +413,7 @@ class AndroidBenchEvaluator:
             
             # Step 3: Create executor and run evaluation
             instance_logger.info("Starting test execution...")
-            executor = AndroidTestExecutor(self.container_manager, config_parser)
+            executor = AndroidTestExecutor(self._start_docker(), config_parser)
             
             try:
                 test_result = executor.execute_instance(
@@ -380,18 +528,31 @@ class AndroidBenchEvaluator:
             
         except Exception as e:
             result.error_message = str(e)
-            instance_logger.error(f"Error evaluating {instance_id}: {e}")
-            instance_logger.error(traceback.format_exc())
+            instance_logger.error(f"Error evaluating {instance_id}: {e}", exc_info=True)
         
         finally:
-            result.total_duration = time.time() - start_time
+            result.total_duration = time.monotonic() - start_time
             
             # Cleanup repository
             if repo_path:
                 self.repo_manager.cleanup_repository(instance_id)
+            
+            if self.logger_manager:
+                self.logger_manager.close_instance_logger(instance_id)
         
         return result
     
+    def _record_result(self, results: Dict[str, EvaluationResult], result: EvaluationResult):
+        """Store a completed result."""
+        results[result.instance_id] = result
+    
+    def _ensure_dir(self, path: Path):
+        """Create a directory once per run, skipping repeat mkdir calls."""
+        if path in self._mkdir_cache:
+            return
+        path.mkdir(exist_ok=True, parents=True)
+        self._mkdir_cache.add(path)
+    
     def _save_instance_result(self, result: EvaluationResult):
         """Save individual instance result."""
         if not self.logger_manager:
@@ -400,40 +561,42 @@ class AndroidBenchEvaluator:
         instance_dir = self.logger_manager.get_instance_log_dir(
             result.instance_id, result.model_name
         )
-        instance_dir.mkdir(exist_ok=True, parents=True)
+        self._ensure_dir(instance_dir)
         
         result_file = instance_dir / "evaluation_result.json"
-        with open(result_file, 'w') as f:
-            json.dump(result.to_dict(), f, indent=2)
+        with open(result_file, 'wb') as f:
+            result.write_json(f)
     
     def _save_final_results(self, results: Dict[str, EvaluationResult], run_id: str):
         """Save final summary results."""
-        successful = [r for r in results.values() if r.success]
-        failed = [r for r in results.values() if not r.success]
+        total = len(results)
         
-        # Calculate test statistics
-        total_tests_run = sum(
-            r.test_execution.total_tests for r in successful 
-            if r.test_execution
-        )
-        total_tests_passed = sum(
-            r.test_execution.passed for r in successful 
-            if r.test_execution
-        )
-        total_tests_failed = sum(
-            r.test_execution.failed for r in successful 
-            if r.test_execution
-        )
+        # Single pass over the results for every summary total
+        n_successful = 0
+        total_tests_run = total_tests_passed = total_tests_failed = 0
+        successful_duration = total_duration = 0.0
+        failed = []
+        for result in results.values():
+            total_duration += result.total_duration
+            if not result.success:
+                failed.append(result)
+                continue
+            n_successful += 1
+            successful_duration += result.total_duration
+            if result.test_execution:
+                total_tests_run += result.test_execution.total_tests
+                total_tests_passed += result.test_execution.passed
+                total_tests_failed += result.test_execution.failed
         
         # Calculate average durations
-        avg_duration = sum(r.total_duration for r in successful) / len(successful) if successful else 0
+        avg_duration = successful_duration / n_successful if n_successful else 0
         
         summary = {
             'run_id': run_id,
-            'total_instances': len(results),
-            'successful': len(successful),
+            'total_instances': total,
+            'successful': n_successful,
             'failed': len(failed),
-            'success_rate': len(successful) / len(results) * 100 if results else 0,
+            'success_rate': n_successful / total * 100 if total else 0,
             
             'test_statistics': {
                 'total_tests_run': total_tests_run,
@@ -444,50 +607,35 @@ class AndroidBenchEvaluator:
             
             'performance_metrics': {
                 'avg_duration_seconds': avg_duration,
-                'total_duration_hours': sum(r.total_duration for r in results.values()) / 3600,
+                'total_duration_hours': total_duration / 3600,
             },
-            
-            'results': {k: v.to_dict() for k, v in results.items()}
         }
         
-        # Save detailed summary
+        # Save detailed summary, encoding per-instance results one at a time
         summary_file = self.output_dir / run_id / "evaluation_summary.json"
-        summary_file.parent.mkdir(exist_ok=True, parents=True)
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        self._ensure_dir(summary_file.parent)
+        with open(summary_file, 'wb') as f:
+            write_summary_with_results(summary, results, f)
         
         # Save readable report
-        report_lines = [
-            "Android-Bench Evaluation Report",
-            "=" * 40,
-            f"Run ID: {run_id}",
-            f"Total Instances: {summary['total_instances']}",
-            f"Successful: {summary['successful']}",
-            f"Failed: {summary['failed']}",
-            f"Success Rate: {summary['success_rate']:.1f}%",
-            "",
-            "Test Statistics:",
-            "-" * 20,
-            f"Total Tests Run: {total_tests_run}",
-            f"Total Tests Passed: {total_tests_passed}",
-            f"Total Tests Failed: {total_tests_failed}",
-            f"Test Pass Rate: {summary['test_statistics']['test_pass_rate']:.1f}%",
-            "",
-            "Performance Metrics:",
-            "-" * 20,
-            f"Average Duration: {avg_duration:.1f}s",
-            f"Total Runtime: {summary['performance_metrics']['total_duration_hours']:.2f}h",
-            "",
-            "Failed Instances:",
-            "-" * 17,
-        ]
-        
-        for result in failed:
-            report_lines.append(f"  - {result.instance_id}: {result.error_message}")
+        report_vars = {
+            'run_id': run_id,
+            'total_instances': summary['total_instances'],
+            'successful': summary['successful'],
+            'failed': summary['failed'],
+            'success_rate': summary['success_rate'],
+            'total_tests_run': total_tests_run,
+            'total_tests_passed': total_tests_passed,
+            'total_tests_failed': total_tests_failed,
+            'test_pass_rate': summary['test_statistics']['test_pass_rate'],
+            'avg_duration': avg_duration,
+            'total_duration_hours': summary['performance_metrics']['total_duration_hours'],
+        }
         
         report_file = self.output_dir / run_id / "evaluation_report.txt"
-        with open(report_file, 'w') as f:
-            f.write('\n'.join(report_lines))
+        with open(report_file, 'w', buffering=1 << 20) as f:
+            f.write(REPORT_HEADER_TEMPLATE.format_map(report_vars))
+            f.writelines(f"  - {r.instance_id}: {r.error_message}\n" for r in failed)
         
         logger.info(f"Evaluation complete: {summary['successful']}/{summary['total_instances']} successful")
         logger.info(f"Test pass rate: {summary['test_statistics']['test_pass_rate']:.1f}%")
@@ -4,19 +4,43 @@ Enhanced Android Test Executor with smart module-specific test discovery.
 This prevents the "No tests found" error by only running tests in modules where they exist.
 """
 
+import functools
 import re
 import logging
 import time
-import tempfile
-import os
+import shlex
+import sys
+from collections import Counter
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+_NEW_FILE_HEADER_RE = re.compile(r'\+\+\+ b/(.+)')
 
-@dataclass
+# Last line printed by the batched patch validation script
+_VALIDATION_DONE = "VALIDATION_DONE"
+
+
+@functools.lru_cache(maxsize=256)
+def _patch_new_files(patch_content: str) -> Tuple[str, ...]:
+    """
+    Files a patch creates, i.e. '+++ b/<path>' headers preceded by a /dev/null line.
+    
+    Cached because every patch strategy re-validates the same patch.
+    """
+    lines = patch_content.split('\n')
+    new_files = []
+    for i, line in enumerate(lines):
+        if i and line.startswith('+++') and '/dev/null' in lines[i - 1]:
+            file_match = _NEW_FILE_HEADER_RE.search(line)
+            if file_match:
+                new_files.append(file_match.group(1))
+    return tuple(new_files)
+
+
+@dataclass(slots=True)
 class TestResult:
     """Represents a single test result."""
     test_name: str
@@ -25,9 +49,14 @@ class TestResult:
     duration: float = 0.0
     failure_message: str = ""
     error_message: str = ""
+    # "<class_name>.<test_name>", built once and interned; used as the test's key
+    full_name: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.full_name = sys.intern(f"{self.class_name}.{self.test_name}")
 
 
-@dataclass
+@dataclass(slots=True)
 class TestExecutionResult:
     """Represents complete test execution results."""
     total_tests: int
@@ -40,26 +69,42 @@ class TestExecutionResult:
     raw_output: str
     test_results: List[TestResult]
     build_successful: bool = False
+    # (test count, names by status), built in one pass on first use
+    _status_index: Optional[Tuple[int, Dict[str, List[str]]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def get_tests_by_status(self, status: str) -> List[TestResult]:
         """Get tests filtered by status."""
         return [test for test in self.test_results if test.status == status]
     
+    def _names_by_status(self) -> Dict[str, List[str]]:
+        """Test names grouped by status; rebuilt if tests were added since."""
+        cached = self._status_index
+        if cached is None or cached[0] != len(self.test_results):
+            names = {"PASSED": [], "FAILED": [], "SKIPPED": [], "ERROR": []}
+            for test in self.test_results:
+                bucket = names.get(test.status)
+                if bucket is not None:
+                    bucket.append(test.full_name)
+            cached = self._status_index = (len(self.test_results), names)
+        return cached[1]
+    
     def get_passed_tests(self) -> List[str]:
         """Get list of passed test names."""
-        return [f"{test.class_name}.{test.test_name}" for test in self.get_tests_by_status("PASSED")]
+        return list(self._names_by_status()["PASSED"])
     
     def get_failed_tests(self) -> List[str]:
         """Get list of failed test names."""
-        return [f"{test.class_name}.{test.test_name}" for test in self.get_tests_by_status("FAILED")]
+        return list(self._names_by_status()["FAILED"])
     
     def get_skipped_tests(self) -> List[str]:
         """Get list of skipped test names."""
-        return [f"{test.class_name}.{test.test_name}" for test in self.get_tests_by_status("SKIPPED")]
+        return list(self._names_by_status()["SKIPPED"])
     
     def get_error_tests(self) -> List[str]:
         """Get list of tests with errors."""
-        return [f"{test.class_name}.{test.test_name}" for test in self.get_tests_by_status("ERROR")]
+        return list(self._names_by_status()["ERROR"])
 
 
 class AndroidTestExecutor:
@@ -141,7 +186,7 @@ class AndroidTestExecutor:
             # Fix git ownership issue first
             exit_code, output = self.container_manager.exec_command(
                 instance_id,
-                "git config --global --add safe.directory /workspace",
+                ["git", "config", "--global", "--add", "safe.directory", "/workspace"],
                 workdir="/workspace"
             )
             
@@ -161,7 +206,7 @@ class AndroidTestExecutor:
             # Fetch to ensure we have the commit
             exit_code, output = self.container_manager.exec_command(
                 instance_id,
-                "git fetch origin --unshallow",
+                ["git", "fetch", "origin", "--unshallow"],
                 workdir="/workspace"
             )
             
@@ -170,7 +215,7 @@ class AndroidTestExecutor:
                 # Fallback to regular fetch
                 exit_code, output = self.container_manager.exec_command(
                     instance_id,
-                    "git fetch origin",
+                    ["git", "fetch", "origin"],
                     workdir="/workspace"
                 )
                 if exit_code != 0:
@@ -179,7 +224,7 @@ class AndroidTestExecutor:
             # Checkout the specific base commit
             exit_code, output = self.container_manager.exec_command(
                 instance_id,
-                f"git checkout {base_commit}",
+                ["git", "checkout", base_commit],
                 workdir="/workspace"
             )
             
@@ -190,7 +235,7 @@ class AndroidTestExecutor:
             # Verify we're on the right commit
             exit_code, current_commit = self.container_manager.exec_command(
                 instance_id,
-                "git rev-parse HEAD",
+                ["git", "rev-parse", "HEAD"],
                 workdir="/workspace"
             )
             
@@ -246,12 +291,20 @@ class AndroidTestExecutor:
             "patch --batch --fuzz=3 -p1",  # Reduced fuzz factor
         ]
         
+        # Place the patch outside the work tree so workspace resets keep it
+        patch_path = patch_filename if patch_filename.startswith('/') else f"/tmp/{patch_filename}"
+        try:
+            self.container_manager.copy_content_to_container(instance_id, patch_content, patch_path)
+        except Exception as e:
+            logger.error(f"Failed to write {patch_filename} into container for {instance_id}: {e}")
+            return False
+        
         for strategy in strategies:
             logger.info(f"Trying patch strategy: {strategy}")
             
             exit_code, output = self.container_manager.exec_command(
                 instance_id,
-                f"{strategy} < {patch_filename}",
+                f"{strategy} < {patch_path}",
                 workdir="/workspace"
             )
             
@@ -277,57 +330,48 @@ class AndroidTestExecutor:
         and existing files were modified as expected.
         """
         try:
-            # Extract files that should be created or modified from patch
-            new_files = []
-            modified_files = []
+            # Extract files that should be created by the patch
+            new_files = _patch_new_files(patch_content)
             
-            for line in patch_content.split('\n'):
-                if line.startswith('+++'):
-                    # New or modified file
-                    file_match = re.search(r'\+\+\+ b/(.+)', line)
-                    if file_match:
-                        file_path = file_match.group(1)
-                        
-                        # Check if this is a new file (previous line should be /dev/null)
-                        prev_line_idx = patch_content.split('\n').index(line) - 1
-                        if prev_line_idx >= 0:
-                            prev_line = patch_content.split('\n')[prev_line_idx]
-                            if '/dev/null' in prev_line:
-                                new_files.append(file_path)
-                            else:
-                                modified_files.append(file_path)
-            
-            # Validate that new files exist
-            for new_file in new_files:
-                file_path = f"/workspace/{new_file}"
-                exit_code, _ = self.container_manager.exec_command(
-                    instance_id,
-                    f"test -f {file_path}",
-                    workdir="/workspace"
-                )
-                
-                if exit_code != 0:
-                    logger.error(f"New file not created: {file_path}")
-                    return False
-                else:
-                    logger.debug(f"Validated new file exists: {file_path}")
+            if not new_files:
+                return True
             
-            # Additional validation: check if files have expected content
+            # Check all new files in a single exec: existence first, then whether
+            # Java/Kotlin sources mention tests at all
+            checks = []
+            for new_file in new_files:
+                quoted = shlex.quote(f"/workspace/{new_file}")
+                checks.append(f"test -f {quoted} || echo MISSING {quoted}")
             for new_file in new_files:
                 if new_file.endswith('.java') or new_file.endswith('.kt'):
-                    # For test files, verify they contain test methods
-                    exit_code, content = self.container_manager.exec_command(
-                        instance_id,
-                        f"cat /workspace/{new_file}",
-                        workdir="/workspace"
-                    )
-                    
-                    if exit_code == 0:
-                        if '@Test' in content or 'test' in content.lower():
-                            logger.debug(f"Validated test file content: {new_file}")
-                        else:
-                            logger.warning(f"Test file may not contain valid tests: {new_file}")
+                    quoted = shlex.quote(f"/workspace/{new_file}")
+                    checks.append(f"test -f {quoted} && ! grep -qi test {quoted} && echo NOTEST {quoted}")
+            
+            # The sentinel proves every check ran; without it the output says nothing
+            exit_code, output = self.container_manager.exec_command(
+                instance_id,
+                "; ".join(checks) + f"; echo {_VALIDATION_DONE}",
+                workdir="/workspace"
+            )
             
+            if exit_code != 0 or _VALIDATION_DONE not in output.splitlines():
+                logger.error(f"Patch validation checks did not complete (exit code {exit_code}): {output}")
+                return False
+            
+            missing = []
+            for line in output.splitlines():
+                status, _, file_path = line.partition(' ')
+                if status == 'MISSING':
+                    missing.append(file_path)
+                elif status == 'NOTEST':
+                    logger.warning(f"Test file may not contain valid tests: {file_path}")
+            
+            if missing:
+                for file_path in missing:
+                    logger.error(f"New file not created: {file_path}")
+                return False
+            
+            logger.debug(f"Validated {len(new_files)} new files exist")
             return True
             
         except Exception as e:
@@ -337,17 +381,10 @@ class AndroidTestExecutor:
     def _reset_workspace(self, instance_id: str):
         """Reset workspace to clean state after failed patch attempt."""
         try:
-            # Reset any partial changes
+            # Reset any partial changes and clean untracked files in one exec
             self.container_manager.exec_command(
                 instance_id,
-                "git reset --hard HEAD",
-                workdir="/workspace"
-            )
-            
-            # Clean untracked files
-            self.container_manager.exec_command(
-                instance_id,
-                "git clean -fd",
+                "git reset --hard HEAD; git clean -fd",
                 workdir="/workspace"
             )
             
@@ -380,29 +417,17 @@ class AndroidTestExecutor:
             if text_patch_lines:
                 text_patch = '\n'.join(text_patch_lines)
                 
-                # Create temporary text patch file
-                text_patch_file = f"{patch_filename}.text"
-                
-                # Write text patch to container
-                exit_code, _ = self.container_manager.exec_command(
-                    instance_id,
-                    f"cat > {text_patch_file}",
-                    workdir="/workspace",
-                    input_data=text_patch
-                )
+                # Apply text patch (written to the container by _apply_patch)
+                text_applied = self._apply_patch(instance_id, text_patch, f"{patch_filename}.text")
                 
-                if exit_code == 0:
-                    # Apply text patch
-                    text_applied = self._apply_patch(instance_id, text_patch, text_patch_file)
+                if text_applied:
+                    logger.info("Successfully applied text portion of patch")
                     
-                    if text_applied:
-                        logger.info("Successfully applied text portion of patch")
-                        
-                        # For binary files, we might need to handle them differently
-                        # or ignore them if they're test resources
-                        return True
-                    else:
-                        logger.warning("Failed to apply text portion of patch")
+                    # For binary files, we might need to handle them differently
+                    # or ignore them if they're test resources
+                    return True
+                else:
+                    logger.warning("Failed to apply text portion of patch")
             
             return False
             
@@ -439,43 +464,32 @@ class AndroidTestExecutor:
                 # Create patch file in container
                 container_patch_path = f"/tmp/{patch_name}_auto_fixed.patch"
                 
-                # Write patch content to a temporary file first
-                with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.patch') as temp_file:
-                    temp_file.write(fixed_patch)
-                    temp_patch_path = temp_file.name
+                self.container_manager.copy_content_to_container(
+                    instance_id, fixed_patch, container_patch_path
+                )
+                
+                # Try multiple strategies with the auto-fixed patch
+                auto_fix_strategies = [
+                    f"git apply --verbose {container_patch_path}",
+                    f"patch -p1 < {container_patch_path}",
+                    f"patch --batch --fuzz=5 -p1 < {container_patch_path}"
+                ]
                 
-                try:
-                    # Copy patch file to container
-                    self.container_manager.copy_to_container(
-                        instance_id, temp_patch_path, container_patch_path
+                for strategy in auto_fix_strategies:
+                    logger.info(f"Trying auto-fix strategy: {strategy}")
+                    exit_code, output = self.container_manager.exec_command(
+                        instance_id, strategy, workdir="/workspace"
                     )
                     
-                    # Try multiple strategies with the auto-fixed patch
-                    auto_fix_strategies = [
-                        f"git apply --verbose {container_patch_path}",
-                        f"patch -p1 < {container_patch_path}",
-                        f"patch --batch --fuzz=5 -p1 < {container_patch_path}"
-                    ]
-                    
-                    for strategy in auto_fix_strategies:
-                        logger.info(f"Trying auto-fix strategy: {strategy}")
-                        exit_code, output = self.container_manager.exec_command(
-                            instance_id, strategy, workdir="/workspace"
-                        )
-                        
-                        if exit_code == 0:
-                            logger.info(f"Successfully applied auto-fixed patch with: {strategy}")
-                            return True
-                        else:
-                            logger.debug(f"Auto-fix strategy failed: {strategy}")
-                            logger.debug(f"Error output: {output}")
-                    
-                    logger.warning(f"All auto-fix strategies failed for {instance_id}")
-                    return False
-                        
-                finally:
-                    # Clean up temporary file
-                    os.unlink(temp_patch_path)
+                    if exit_code == 0:
+                        logger.info(f"Successfully applied auto-fixed patch with: {strategy}")
+                        return True
+                    else:
+                        logger.debug(f"Auto-fix strategy failed: {strategy}")
+                        logger.debug(f"Error output: {output}")
+                
+                logger.warning(f"All auto-fix strategies failed for {instance_id}")
+                return False
             
             return False
             
@@ -787,7 +801,7 @@ class AndroidTestExecutor:
             # Fallback: scan filesystem
             exit_code, output = self.container_manager.exec_command(
                 instance_id,
-                "find /workspace -maxdepth 2 -name 'build.gradle' -o -name 'build.gradle.kts' | grep -v '/workspace/build.gradle'",
+                "find /workspace -maxdepth 2 -type f \\( -name 'build.gradle' -o -name 'build.gradle.kts' \\) | grep -v '/workspace/build.gradle'",
                 workdir="/workspace"
             )
             
@@ -867,9 +881,9 @@ class AndroidTestExecutor:
         # Prepare environment for testing
         self._prepare_test_environment(instance_id)
         
-        start_time = time.time()
+        start_time = time.monotonic()
         all_results = []
-        combined_output = ""
+        output_parts = []
         final_exit_code = 0
         
         for task in test_tasks:
@@ -878,12 +892,15 @@ class AndroidTestExecutor:
             # Run the specific test task with retry logic
             exit_code, output = self._execute_gradle_test_with_retry(instance_id, task)
             
-            combined_output += f"\n{'='*50}\n"
-            combined_output += f"Task: {task}\n"
-            combined_output += f"Exit Code: {exit_code}\n"
-            combined_output += f"{'='*50}\n"
-            combined_output += output
-            combined_output += f"\n{'='*50}\n"
+            # Collect pieces and join once; Gradle output can run to megabytes
+            output_parts.extend((
+                f"\n{'='*50}\n",
+                f"Task: {task}\n",
+                f"Exit Code: {exit_code}\n",
+                f"{'='*50}\n",
+                output,
+                f"\n{'='*50}\n",
+            ))
             
             if exit_code != 0:
                 final_exit_code = exit_code
@@ -892,7 +909,8 @@ class AndroidTestExecutor:
             task_results = self._parse_test_results(output, task)
             all_results.extend(task_results)
         
-        total_duration = time.time() - start_time
+        total_duration = time.monotonic() - start_time
+        combined_output = "".join(output_parts)
         
         # Combine and summarize all results
         combined_result = self._create_execution_result(
@@ -975,14 +993,14 @@ class AndroidTestExecutor:
         logger.info(f"Executing: {gradle_cmd}")
         
         # Execute with timeout (30 minutes max)
-        start_time = time.time()
+        start_time = time.monotonic()
         exit_code, output = self.container_manager.exec_command(
             instance_id,
             gradle_cmd,
             workdir="/workspace"
         )
         
-        execution_time = time.time() - start_time
+        execution_time = time.monotonic() - start_time
         logger.info(f"Test execution completed in {execution_time:.2f}s with exit code {exit_code}")
         
         return exit_code, output
@@ -1051,10 +1069,11 @@ class AndroidTestExecutor:
         """Create a comprehensive test execution result."""
         
         total_tests = len(test_results)
-        passed = len([t for t in test_results if t.status == 'PASSED'])
-        failed = len([t for t in test_results if t.status == 'FAILED'])
-        skipped = len([t for t in test_results if t.status == 'SKIPPED'])
-        errors = len([t for t in test_results if t.status == 'ERROR'])
+        status_counts = Counter(t.status for t in test_results)
+        passed = status_counts['PASSED']
+        failed = status_counts['FAILED']
+        skipped = status_counts['SKIPPED']
+        errors = status_counts['ERROR']
         
         # Determine if build was successful based on output
         build_successful = 'BUILD SUCCESSFUL' in raw_output
@@ -6,13 +6,66 @@ Dataset and prediction loading utilities for Android-bench.
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
 from dataclasses import dataclass
 
+from patch_processor import PatchExtractor
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _json_loads(data: bytes):
+    """Decode one JSONL record, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_INSTANCE_ID_KEY = b'"instance_id"'
+
+
+def _peek_instance_id(line: bytes) -> Optional[str]:
+    """
+    Read the top-level instance_id of a raw JSONL record without decoding it.
+    
+    Returns None when the value cannot be read cheaply (missing key, a
+    '{' or '[' before the key that may open a nested object, escaped
+    characters), in which case the record must be fully parsed.
+    """
+    key = line.find(_INSTANCE_ID_KEY)
+    if key == -1:
+        return None
+    # Only the record's own opening brace may precede a top-level key
+    if line.count(b'{', 0, key) != 1 or line.find(b'[', 0, key) != -1:
+        return None
+    after_key = key + len(_INSTANCE_ID_KEY)
+    start = line.find(b'"', after_key)
+    if start == -1 or line[after_key:start].strip() != b':':
+        return None
+    end = line.find(b'"', start + 1)
+    if end == -1:
+        return None
+    value = line[start + 1:end]
+    if b'\\' in value:
+        return None
+    return value.decode('utf-8', errors='replace')
+
+
+def _wanted(line: bytes, id_set: Optional[frozenset]) -> bool:
+    """Whether a raw record may belong to the selected instance IDs."""
+    if id_set is None:
+        return True
+    instance_id = _peek_instance_id(line)
+    return instance_id is None or instance_id in id_set
+
+
+@dataclass(slots=True)
 class TaskInstance:
     """Android-bench task instance."""
     repo: str
@@ -28,7 +81,7 @@ class TaskInstance:
     created_at: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelPrediction:
     """Model prediction for a task instance."""
     instance_id: str
@@ -41,9 +94,14 @@ class ModelPrediction:
     response_time: float
     cost: float
     base_commit: str
-    error: Optional[str]
-    timestamp: str
-    prompt: str
+    error: Optional[str] = None
+    timestamp: str = ""
+    prompt: str = ""
+
+
+# Declared fields, used to drop unknown keys from JSONL records
+_INSTANCE_FIELDS = frozenset(TaskInstance.__dataclass_fields__)
+_PREDICTION_FIELDS = frozenset(ModelPrediction.__dataclass_fields__)
 
 
 class DatasetLoader:
@@ -57,21 +115,34 @@ class DatasetLoader:
             raise FileNotFoundError(f"Dataset file not found: {dataset_path}")
         if not self.predictions_path.exists():
             raise FileNotFoundError(f"Predictions file not found: {predictions_path}")
+        
+        # Extracted patches by instance ID, reused across filter_instances calls
+        self._patch_cache: Dict[str, str] = {}
     
-    def load_dataset(self) -> Dict[str, TaskInstance]:
-        """Load task instances from JSONL file."""
+    def load_dataset(self, instance_ids: Optional[Iterable[str]] = None) -> Dict[str, TaskInstance]:
+        """
+        Load task instances from JSONL file.
+        
+        When instance_ids is given, records for other instances are skipped
+        before they are decoded.
+        """
         instances = {}
+        id_set = frozenset(instance_ids) if instance_ids else None
         
         logger.info(f"Loading dataset from {self.dataset_path}")
-        with open(self.dataset_path, 'r', encoding='utf-8') as f:
+        with open(self.dataset_path, 'rb') as f:
             for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
+                if not line.strip() or not _wanted(line, id_set):
                     continue
                     
                 try:
-                    data = json.loads(line)
-                    instance = TaskInstance(**data)
+                    data = _json_loads(line)
+                    if not isinstance(data, dict):
+                        logger.error(f"Invalid task instance format on line {line_num}: expected a JSON object")
+                        continue
+                    instance = TaskInstance(**{k: v for k, v in data.items() if k in _INSTANCE_FIELDS})
+                    if id_set is not None and instance.instance_id not in id_set:
+                        continue
                     instances[instance.instance_id] = instance
                 except json.JSONDecodeError as e:
                     logger.error(f"Invalid JSON on line {line_num}: {e}")
@@ -83,20 +154,30 @@ class DatasetLoader:
         logger.info(f"Loaded {len(instances)} task instances")
         return instances
     
-    def load_predictions(self) -> Dict[str, ModelPrediction]:
-        """Load model predictions from JSONL file."""
+    def load_predictions(self, instance_ids: Optional[Iterable[str]] = None) -> Dict[str, ModelPrediction]:
+        """
+        Load model predictions from JSONL file.
+        
+        When instance_ids is given, records for other instances are skipped
+        before they are decoded.
+        """
         predictions = {}
+        id_set = frozenset(instance_ids) if instance_ids else None
         
         logger.info(f"Loading predictions from {self.predictions_path}")
-        with open(self.predictions_path, 'r', encoding='utf-8') as f:
+        with open(self.predictions_path, 'rb') as f:
             for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
+                if not line.strip() or not _wanted(line, id_set):
                     continue
                     
                 try:
-                    data = json.loads(line)
-                    prediction = ModelPrediction(**data)
+                    data = _json_loads(line)
+                    if not isinstance(data, dict):
+                        logger.error(f"Invalid prediction format on line {line_num}: expected a JSON object")
+                        continue
+                    prediction = ModelPrediction(**{k: v for k, v in data.items() if k in _PREDICTION_FIELDS})
+                    if id_set is not None and prediction.instance_id not in id_set:
+                        continue
                     predictions[prediction.instance_id] = prediction
                 except json.JSONDecodeError as e:
                     logger.error(f"Invalid JSON on line {line_num}: {e}")
@@ -118,54 +199,54 @@ class DatasetLoader:
     ) -> Dict[str, TaskInstance]:
         """Filter instances based on various criteria."""
         
+        # Set lookup keeps the ID filter linear in the dataset size
+        id_set = frozenset(instance_ids) if instance_ids else None
+        
         # Start with instances that have predictions
         filtered = {}
+        skipped_completed = []
+        skipped_empty = []
         for instance_id, instance in instances.items():
             if instance_id not in predictions:
                 continue
             
             # Filter by specific instance IDs if provided
-            if instance_ids and instance_id not in instance_ids:
+            if id_set and instance_id not in id_set:
                 continue
             
             # Skip already completed instances
             if completed_instances and instance_id in completed_instances:
-                logger.debug(f"Skipping completed instance: {instance_id}")
+                skipped_completed.append(instance_id)
                 continue
             
             # Filter out empty/null patches if requested
             prediction = predictions[instance_id]
             if exclude_empty_patches:
-                patch_content = self._extract_patch_from_output(prediction.full_output)
+                patch_content = self._extract_patch(instance_id, prediction.full_output)
                 if not patch_content or not patch_content.strip():
-                    logger.debug(f"Skipping instance with empty patch: {instance_id}")
+                    skipped_empty.append(instance_id)
                     continue
             
             filtered[instance_id] = instance
         
+        # One summary line per reason instead of a log call per instance
+        if skipped_completed:
+            logger.info("Skipped %d completed instances", len(skipped_completed))
+            logger.debug("Completed instances: %s", skipped_completed)
+        if skipped_empty:
+            logger.info("Skipped %d instances with empty patches", len(skipped_empty))
+            logger.debug("Instances with empty patches: %s", skipped_empty)
+        
         logger.info(f"Filtered to {len(filtered)} instances for evaluation")
         return filtered
     
-    def _extract_patch_from_output(self, full_output: str) -> str:
+    def _extract_patch(self, instance_id: str, full_output: str) -> str:
         """Extract patch content from model's full output."""
-        if not full_output:
-            return ""
-        
-        # Look for diff blocks in markdown code blocks
-        import re
-        
-        # Pattern for markdown code blocks with diff
-        diff_pattern = r'```(?:diff)?\n(.*?)```'
-        matches = re.findall(diff_pattern, full_output, re.DOTALL)
-        
-        if matches:
-            return matches[0].strip()
-        
-        # If no markdown blocks, check if the entire output is a diff
-        if full_output.strip().startswith('diff --git') or full_output.strip().startswith('---'):
-            return full_output.strip()
-        
-        return ""
+        patch_content = self._patch_cache.get(instance_id)
+        if patch_content is None:
+            patch_content = PatchExtractor.extract_patch(full_output)
+            self._patch_cache[instance_id] = patch_content
+        return patch_content
     
     def get_completed_instances(self, run_id: str, output_dir: str) -> Set[str]:
         """Get set of already completed instance IDs from previous runs."""
@@ -175,18 +256,8 @@ class DatasetLoader:
         if not results_dir.exists():
             return completed
         
-        # Look for completed evaluations (presence of report.json files)
-        for model_dir in results_dir.iterdir():
-            if not model_dir.is_dir():
-                continue
-                
-            for instance_dir in model_dir.iterdir():
-                if not instance_dir.is_dir():
-                    continue
-                
-                report_file = instance_dir / "report.json"
-                if report_file.exists():
-                    completed.add(instance_dir.name)
+        # Look for completed evaluations (presence of <model>/<instance>/report.json)
+        completed = {report.parent.name for report in results_dir.glob("*/*/report.json")}
         
         logger.info(f"Found {len(completed)} completed instances from previous runs")
         return completed
@@ -205,13 +276,14 @@ def load_dataset_and_predictions(
     Convenience function to load and filter dataset and predictions.
     
     Returns:
-        Tuple of (filtered_instances, all_predictions)
+        Tuple of (filtered_instances, all_predictions); when instance_ids is
+        given, predictions are limited to those instances
     """
     loader = DatasetLoader(dataset_path, predictions_path)
     
-    # Load raw data
-    all_instances = loader.load_dataset()
-    all_predictions = loader.load_predictions()
+    # Load raw data, skipping unselected records before decoding them
+    all_instances = loader.load_dataset(instance_ids)
+    all_predictions = loader.load_predictions(instance_ids)
     
     # Get completed instances if needed
     completed_instances = set()
@@ -3,22 +3,139 @@
 Logging configuration and utilities for Android-bench evaluation.
 """
 
+import atexit
+import gzip
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Dict, Iterable, Optional, Set, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Formatters are stateless, so one instance of each is shared by all handlers
+_DETAILED_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+)
+_SIMPLE_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(levelname)s - %(message)s'
+)
+_INSTANCE_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
+)
+
+
+def _dumps(obj) -> bytes:
+    """Encode JSON to UTF-8 bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _to_bytes(text: Union[str, bytes]) -> bytes:
+    """Encode text as UTF-8, passing bytes through unchanged."""
+    return text.encode('utf-8') if isinstance(text, str) else text
+
+
+def _stream_json_array(f: BinaryIO, items: Iterable, encode=_dumps):
+    """Write items to a binary file as a JSON array, one element per line.
+    
+    Only one encoded element is held in memory at a time.
+    """
+    f.write(b'[')
+    separator = b'\n'
+    for item in items:
+        f.write(separator)
+        f.write(encode(item))
+        separator = b',\n'
+    f.write(b'\n]')
+
+
+@lru_cache(maxsize=4096)
+def _instance_dir(output_dir: Path, run_id: str, model_name: str, instance_id: str) -> Path:
+    """Build (once per instance) the log directory of an instance."""
+    return output_dir / run_id / model_name.replace("/", "__") / instance_id
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that writes through a large buffer instead of flushing
+    after every record.
+    
+    The buffer is flushed when a record at or above flush_level arrives, when
+    flush_interval seconds have passed since the last flush, and on close.
+    """
+    
+    def __init__(self, filename, encoding: Optional[str] = 'utf-8',
+                 buffer_size: int = 64 * 1024, flush_level: int = logging.WARNING,
+                 flush_interval: float = 30.0):
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+        super().__init__(filename, encoding=encoding)
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= self.flush_level or record.created - self._last_flush >= self.flush_interval:
+                self.flush()
+                self._last_flush = record.created
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
 
 
 class AndroidBenchLogger:
     """Configures and manages logging for Android-bench evaluation."""
     
-    def __init__(self, output_dir: str, run_id: str):
+    def __init__(self, output_dir: str, run_id: str, async_writes: bool = True,
+                 write_summary: bool = True, compress_logs: bool = False):
         self.output_dir = Path(output_dir)
         self.run_id = run_id
+        # Whether save_test_results also writes test_summary.txt
+        self.write_summary = write_summary
+        # Whether test_output.txt / container.log are written as gzip (.gz)
+        self.compress_logs = compress_logs
         self.log_dir = self.output_dir / run_id / "logs"
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
+        # Directories already created this run
+        self._mkdir_cache: Set[Path] = {self.log_dir}
+        
+        # Open per-instance log handlers, closed by close_instance_logger()
+        # or, for any left open, by close()
+        self._instance_handlers: Dict[str, logging.FileHandler] = {}
+        self._instance_loggers: Dict[str, logging.Logger] = {}
+        
+        # save_* calls are queued to a single writer thread so evaluation
+        # workers don't block on disk; queued writes finish in order
+        self._writer: Optional[ThreadPoolExecutor] = None
+        if async_writes:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="android_bench_log_writer")
+        
         # Setup main logger
+        self.console_handler: Optional[logging.Handler] = None
+        self._file_handler: Optional[logging.Handler] = None
+        self._queue_handler: Optional[logging.Handler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
         self._setup_main_logger()
     
     def _setup_main_logger(self):
@@ -34,33 +151,43 @@ class AndroidBenchLogger:
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
         
-        # Create formatters
-        detailed_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-        )
-        simple_formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s'
-        )
-        
         # File handler (detailed)
-        file_handler = logging.FileHandler(main_log_file, encoding='utf-8')
+        file_handler = BufferedFileHandler(main_log_file)
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(detailed_formatter)
-        root_logger.addHandler(file_handler)
+        file_handler.setFormatter(_DETAILED_FORMATTER)
+        self._file_handler = file_handler
         
         # Console handler (simpler)
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(simple_formatter)
-        root_logger.addHandler(console_handler)
+        console_handler.setFormatter(_SIMPLE_FORMATTER)
+        self.console_handler = console_handler
+        
+        # Log calls only enqueue the record; a listener thread formats and
+        # writes it to the real handlers
+        log_queue = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(log_queue)
+        root_logger.addHandler(self._queue_handler)
+        self._listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        # Drain the queue on exit if close() is never called
+        atexit.register(self._stop_main_logger)
         
         logging.info(f"Logging initialized - logs will be saved to {self.log_dir}")
     
     def setup_instance_logger(self, instance_id: str, model_name: str) -> logging.Logger:
         """Setup a dedicated logger for a specific instance."""
         # Create instance-specific log directory
-        instance_log_dir = self.output_dir / self.run_id / model_name.replace("/", "__") / instance_id
-        instance_log_dir.mkdir(parents=True, exist_ok=True)
+        instance_log_dir = self.get_instance_log_dir(instance_id, model_name)
+        self._ensure_dir(instance_log_dir)
+        instance_log_file = instance_log_dir / "instance.log"
+        
+        # Reuse the logger if it is already open on the same file
+        handler = self._instance_handlers.get(instance_id)
+        if handler is not None and handler.baseFilename == os.path.abspath(instance_log_file):
+            return self._instance_loggers[instance_id]
         
         # Create instance logger
         logger_name = f"android_bench.{instance_id}"
@@ -70,190 +197,245 @@ class AndroidBenchLogger:
         # Remove any existing handlers for this logger
         for handler in instance_logger.handlers[:]:
             instance_logger.removeHandler(handler)
-        
-        # Create instance log file
-        instance_log_file = instance_log_dir / "instance.log"
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-        )
+            handler.close()
         
         # File handler for instance
-        file_handler = logging.FileHandler(instance_log_file, encoding='utf-8')
+        file_handler = BufferedFileHandler(instance_log_file)
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(_INSTANCE_FORMATTER)
         instance_logger.addHandler(file_handler)
+        self._instance_handlers[instance_id] = file_handler
+        self._instance_loggers[instance_id] = instance_logger
         
         # Don't propagate to parent logger to avoid duplication
         instance_logger.propagate = False
         
         return instance_logger
     
-    def save_test_results(self, instance_id: str, model_name: str, 
-                         test_execution_result) -> str:
+    def close_instance_logger(self, instance_id: str):
+        """Flush and close the handlers of an instance logger."""
+        instance_logger = logging.getLogger(f"android_bench.{instance_id}")
+        for handler in instance_logger.handlers[:]:
+            instance_logger.removeHandler(handler)
+            handler.close()
+        self._instance_handlers.pop(instance_id, None)
+        self._instance_loggers.pop(instance_id, None)
+    
+    def save_test_results(self, instance_id: str, model_name: str, test_execution_result):
         """Save detailed test results to a structured file."""
-        # Import json at the top of the function since it's used here
-        import json
-        
-        instance_log_dir = self.output_dir / self.run_id / model_name.replace("/", "__") / instance_id
-        instance_log_dir.mkdir(parents=True, exist_ok=True)
-        instance_log_dir = self.output_dir / self.run_id / model_name.replace("/", "__") / instance_id
-        instance_log_dir.mkdir(parents=True, exist_ok=True)
+        self._submit_write(self._write_test_results, instance_id, model_name, test_execution_result)
+    
+    def save_execution_logs(self, instance_id: str, model_name: str, 
+                           test_output: Union[str, bytes], container_logs: Union[str, bytes] = ""):
+        """Save test execution logs for an instance."""
+        self._submit_write(self._write_execution_logs, instance_id, model_name, test_output, container_logs)
+    
+    def save_patch_files(self, instance_id: str, model_name: str, 
+                        test_patch: Union[str, bytes], prediction_patch: Union[str, bytes]):
+        """Save patch files for debugging."""
+        self._submit_write(self._write_patch_files, instance_id, model_name, test_patch, prediction_patch)
+    
+    def flush(self):
+        """Block until every queued save_* write has completed."""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+    
+    def close(self):
+        """Finish queued writes, close instance logs and flush the main log."""
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        for instance_id in list(self._instance_handlers):
+            self.close_instance_logger(instance_id)
+        atexit.unregister(self._stop_main_logger)
+        self._stop_main_logger()
+    
+    def _stop_main_logger(self):
+        """Detach the queue handler, drain the listener and close the main log file."""
+        if self._queue_handler is not None:
+            logging.getLogger().removeHandler(self._queue_handler)
+            self._queue_handler = None
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._file_handler is not None:
+            self._file_handler.close()
+            self._file_handler = None
+    
+    def _submit_write(self, fn, *args):
+        """Run a write on the writer thread, or inline when writes are synchronous."""
+        if self._writer is None:
+            fn(*args)
+            return
+        self._writer.submit(fn, *args).add_done_callback(self._report_write_error)
+    
+    @staticmethod
+    def _report_write_error(future: Future):
+        exc = future.exception()
+        if exc is not None:
+            logging.error(f"Failed to write instance logs: {exc}")
+    
+    def _write_test_results(self, instance_id: str, model_name: str, test_execution_result) -> str:
+        instance_log_dir = self.get_instance_log_dir(instance_id, model_name)
+        self._ensure_dir(instance_log_dir)
         
         if not test_execution_result:
             return ""
         
-        # Create detailed test results
-        test_results_data = {
-            'summary': {
-                'total_tests': test_execution_result.total_tests,
-                'passed': test_execution_result.passed,
-                'failed': test_execution_result.failed,
-                'skipped': test_execution_result.skipped,
-                'errors': test_execution_result.errors,
-                'duration': test_execution_result.duration,
-                'exit_code': test_execution_result.exit_code,
-                'build_successful': test_execution_result.build_successful
-            },
-            'test_lists': {
-                'passed_tests': test_execution_result.get_passed_tests(),
-                'failed_tests': test_execution_result.get_failed_tests(),
-                'skipped_tests': test_execution_result.get_skipped_tests(),
-                'error_tests': test_execution_result.get_error_tests()
-            },
-            'detailed_results': [
+        summary = {
+            'total_tests': test_execution_result.total_tests,
+            'passed': test_execution_result.passed,
+            'failed': test_execution_result.failed,
+            'skipped': test_execution_result.skipped,
+            'errors': test_execution_result.errors,
+            'duration': test_execution_result.duration,
+            'exit_code': test_execution_result.exit_code,
+            'build_successful': test_execution_result.build_successful
+        }
+        passed_tests = test_execution_result.get_passed_tests()
+        failed_tests = test_execution_result.get_failed_tests()
+        skipped_tests = test_execution_result.get_skipped_tests()
+        error_tests = test_execution_result.get_error_tests()
+        test_lists = {
+            'passed_tests': passed_tests,
+            'failed_tests': failed_tests,
+            'skipped_tests': skipped_tests,
+            'error_tests': error_tests
+        }
+        
+        # Full names are built once and shared by the JSON and summary output
+        tests = test_execution_result.test_results
+        full_names = [test.full_name for test in tests]
+        
+        # Save as JSON, streaming detailed_results one test at a time
+        test_results_file = instance_log_dir / "test_results.json"
+        with open(test_results_file, 'wb', buffering=1 << 20) as f:
+            f.write(b'{\n"summary": ')
+            f.write(_dumps(summary))
+            f.write(b',\n"test_lists": ')
+            f.write(_dumps(test_lists))
+            f.write(b',\n"detailed_results": ')
+            _stream_json_array(f, (
                 {
                     'test_name': test.test_name,
                     'class_name': test.class_name,
-                    'full_name': f"{test.class_name}.{test.test_name}",
+                    'full_name': full_name,
                     'status': test.status,
                     'duration': test.duration,
                     'failure_message': test.failure_message,
                     'error_message': test.error_message
                 }
-                for test in test_execution_result.test_results
-            ]
-        }
-        
-        # Save as JSON
-        test_results_file = instance_log_dir / "test_results.json"
-        with open(test_results_file, 'w', encoding='utf-8') as f:
-            json.dump(test_results_data, f, indent=2)
-        
-        # Save human-readable test summary
-        summary_lines = [
-            f"Test Execution Summary for {instance_id}",
-            "=" * 50,
-            f"Total Tests: {test_execution_result.total_tests}",
-            f"Passed: {test_execution_result.passed}",
-            f"Failed: {test_execution_result.failed}",
-            f"Skipped: {test_execution_result.skipped}",
-            f"Errors: {test_execution_result.errors}",
-            f"Duration: {test_execution_result.duration:.2f}s",
-            f"Build Successful: {test_execution_result.build_successful}",
-            "",
-        ]
-        
-        # Add passed tests
-        passed_tests = test_execution_result.get_passed_tests()
-        if passed_tests:
-            summary_lines.extend([
-                f"✅ Passed Tests ({len(passed_tests)}):",
-                "-" * 30,
-            ])
-            for test in passed_tests:
-                summary_lines.append(f"  ✓ {test}")
-            summary_lines.append("")
-        
-        # Add failed tests
-        failed_tests = test_execution_result.get_failed_tests()
-        if failed_tests:
-            summary_lines.extend([
-                f"❌ Failed Tests ({len(failed_tests)}):",
-                "-" * 30,
-            ])
-            for test in failed_tests:
-                # Find the detailed test for failure message
-                test_detail = next(
-                    (t for t in test_execution_result.test_results 
-                     if f"{t.class_name}.{t.test_name}" == test), 
-                    None
-                )
-                summary_lines.append(f"  ✗ {test}")
-                if test_detail and test_detail.failure_message:
-                    # Truncate long failure messages
-                    failure_msg = test_detail.failure_message[:200]
-                    if len(test_detail.failure_message) > 200:
-                        failure_msg += "..."
-                    summary_lines.append(f"    → {failure_msg}")
-            summary_lines.append("")
-        
-        # Add skipped tests
-        skipped_tests = test_execution_result.get_skipped_tests()
-        if skipped_tests:
-            summary_lines.extend([
-                f"⏭️ Skipped Tests ({len(skipped_tests)}):",
-                "-" * 30,
-            ])
-            for test in skipped_tests:
-                summary_lines.append(f"  ⏭ {test}")
-            summary_lines.append("")
-        
-        # Add error tests
-        error_tests = test_execution_result.get_error_tests()
-        if error_tests:
-            summary_lines.extend([
-                f"💥 Tests with Errors ({len(error_tests)}):",
-                "-" * 35,
-            ])
-            for test in error_tests:
-                summary_lines.append(f"  💥 {test}")
-            summary_lines.append("")
-        
-        test_summary_file = instance_log_dir / "test_summary.txt"
-        with open(test_summary_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(summary_lines))
-        
-    def save_execution_logs(self, instance_id: str, model_name: str, 
-                           test_output: str, container_logs: str = ""):
-        """Save test execution logs for an instance."""
-        instance_log_dir = self.output_dir / self.run_id / model_name.replace("/", "__") / instance_id
-        instance_log_dir.mkdir(parents=True, exist_ok=True)
+                for full_name, test in zip(full_names, tests)
+            ))
+            f.write(b'}\n')
+        
+        if self.write_summary:
+            self._write_test_summary(
+                instance_log_dir / "test_summary.txt", instance_id, test_execution_result,
+                passed_tests, failed_tests, skipped_tests, error_tests,
+                full_names, tests
+            )
+    
+    @staticmethod
+    def _write_test_summary(test_summary_file: Path, instance_id: str, test_execution_result,
+                            passed_tests, failed_tests, skipped_tests, error_tests,
+                            full_names, tests):
+        """Save the human-readable test summary, streamed line by line.
+        
+        The header has no trailing newline; every later line is written as
+        "\n" + line, and sections without tests are left out entirely.
+        """
+        with open(test_summary_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            def section(title: str, rule_width: int, items, marker: str):
+                if not items:
+                    return
+                f.write(f"\n{title} ({len(items)}):\n{'-' * rule_width}")
+                f.writelines(f"\n  {marker} {test}" for test in items)
+                f.write("\n")
+            
+            f.write('\n'.join((
+                f"Test Execution Summary for {instance_id}",
+                "=" * 50,
+                f"Total Tests: {test_execution_result.total_tests}",
+                f"Passed: {test_execution_result.passed}",
+                f"Failed: {test_execution_result.failed}",
+                f"Skipped: {test_execution_result.skipped}",
+                f"Errors: {test_execution_result.errors}",
+                f"Duration: {test_execution_result.duration:.2f}s",
+                f"Build Successful: {test_execution_result.build_successful}",
+                "",
+            )))
+            
+            section("✅ Passed Tests", 30, passed_tests, "✓")
+            
+            # Failed tests also carry their (truncated) failure message
+            if failed_tests:
+                # Detailed test by full name, keeping the first on duplicates
+                detail_by_full = dict(zip(reversed(full_names), reversed(tests)))
+                f.write(f"\n❌ Failed Tests ({len(failed_tests)}):\n{'-' * 30}")
+                for test in failed_tests:
+                    test_detail = detail_by_full.get(test)
+                    f.write(f"\n  ✗ {test}")
+                    if test_detail and test_detail.failure_message:
+                        # Truncate long failure messages
+                        failure_msg = test_detail.failure_message[:200]
+                        if len(test_detail.failure_message) > 200:
+                            failure_msg += "..."
+                        f.write(f"\n    → {failure_msg}")
+                f.write("\n")
+            
+            section("⏭️ Skipped Tests", 30, skipped_tests, "⏭")
+            section("💥 Tests with Errors", 35, error_tests, "💥")
+    
+    def _write_execution_logs(self, instance_id: str, model_name: str, 
+                              test_output: Union[str, bytes], container_logs: Union[str, bytes] = ""):
+        instance_log_dir = self.get_instance_log_dir(instance_id, model_name)
+        self._ensure_dir(instance_log_dir)
         
         # Save test output
-        test_output_file = instance_log_dir / "test_output.txt"
-        with open(test_output_file, 'w', encoding='utf-8') as f:
-            f.write(test_output)
+        with self._open_output_log(instance_log_dir / "test_output.txt") as f:
+            f.write(_to_bytes(test_output))
         
         # Save container logs if available
         if container_logs:
-            container_logs_file = instance_log_dir / "container.log"
-            with open(container_logs_file, 'w', encoding='utf-8') as f:
-                f.write(container_logs)
+            with self._open_output_log(instance_log_dir / "container.log") as f:
+                f.write(_to_bytes(container_logs))
     
-    def save_patch_files(self, instance_id: str, model_name: str, 
-                        test_patch: str, prediction_patch: str):
-        """Save patch files for debugging."""
-        instance_log_dir = self.output_dir / self.run_id / model_name.replace("/", "__") / instance_id
-        instance_log_dir.mkdir(parents=True, exist_ok=True)
+    def _open_output_log(self, path: Path) -> BinaryIO:
+        """Open a raw output log for writing, gzip-compressed if enabled."""
+        if self.compress_logs:
+            return gzip.open(path.with_name(path.name + ".gz"), 'wb', compresslevel=1)
+        return open(path, 'wb')
+    
+    def _write_patch_files(self, instance_id: str, model_name: str, 
+                           test_patch: Union[str, bytes], prediction_patch: Union[str, bytes]):
+        instance_log_dir = self.get_instance_log_dir(instance_id, model_name)
+        self._ensure_dir(instance_log_dir)
         
         # Save test patch
         test_patch_file = instance_log_dir / "test.patch"
-        with open(test_patch_file, 'w', encoding='utf-8') as f:
-            f.write(test_patch)
+        with open(test_patch_file, 'wb') as f:
+            f.write(_to_bytes(test_patch))
         
         # Save prediction patch
         prediction_patch_file = instance_log_dir / "prediction.patch"
-        with open(prediction_patch_file, 'w', encoding='utf-8') as f:
-            f.write(prediction_patch)
+        with open(prediction_patch_file, 'wb') as f:
+            f.write(_to_bytes(prediction_patch))
     
     def get_instance_log_dir(self, instance_id: str, model_name: str) -> Path:
         """Get the log directory for a specific instance."""
-        return self.output_dir / self.run_id / model_name.replace("/", "__") / instance_id
+        return _instance_dir(self.output_dir, self.run_id, model_name, instance_id)
+    
+    def _ensure_dir(self, path: Path):
+        """Create a directory once per run, skipping repeat mkdir calls."""
+        if path in self._mkdir_cache:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        self._mkdir_cache.add(path)
 
 
-def setup_logging(output_dir: str, run_id: str, log_level: str = "INFO") -> AndroidBenchLogger:
+def setup_logging(output_dir: str, run_id: str, log_level: str = "INFO",
+                  write_summary: bool = True, compress_logs: bool = False) -> AndroidBenchLogger:
     """
     Setup logging for Android-bench evaluation.
     
@@ -261,6 +443,8 @@ def setup_logging(output_dir: str, run_id: str, log_level: str = "INFO") -> Andr
         output_dir: Base output directory
         run_id: Unique run identifier
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
+        write_summary: Also write a human-readable test_summary.txt per instance
+        compress_logs: Write test_output and container logs gzip-compressed
     
     Returns:
         AndroidBenchLogger instance
@@ -271,13 +455,12 @@ def setup_logging(output_dir: str, run_id: str, log_level: str = "INFO") -> Andr
         raise ValueError(f'Invalid log level: {log_level}')
     
     # Create logger instance
-    logger_manager = AndroidBenchLogger(output_dir, run_id)
+    logger_manager = AndroidBenchLogger(
+        output_dir, run_id, write_summary=write_summary, compress_logs=compress_logs
+    )
     
     # Set the console handler level
-    root_logger = logging.getLogger()
-    for handler in root_logger.handlers:
-        if isinstance(handler, logging.StreamHandler) and handler.stream == sys.stdout:
-            handler.setLevel(numeric_level)
+    logger_manager.console_handler.setLevel(numeric_level)
     
     return logger_manager
 
@@ -285,7 +468,6 @@ def setup_logging(output_dir: str, run_id: str, log_level: str = "INFO") -> Andr
 if __name__ == "__main__":
     # Test the logging setup
     import tempfile
-    import os
     
     with tempfile.TemporaryDirectory() as temp_dir:
         logger_manager = setup_logging(temp_dir, "test_run", "DEBUG")
@@ -306,6 +488,7 @@ if __name__ == "__main__":
             "Test output", 
             "Container logs"
         )
+        logger_manager.flush()
         
         print(f"Logs saved to: {logger_manager.log_dir}")
         print(f"Instance logs saved to: {logger_manager.get_instance_log_dir('test_instance', 'test_model')}")
\ No newline at end of file
@@ -28,14 +28,109 @@ import re
 import subprocess
 import tempfile
 import os
+import io
+import mmap
+import shutil
 import logging
-from typing import List, Optional, Dict, Tuple
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Dict, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Markdown fences searched for patches, as (language tags, required body prefixes).
+# Equivalent to the regexes
+#   ```(?:diff|patch)\n(.*?)\n```
+#   ```\n(--- a/.*?)\n```                          (patches that start with --- a/)
+#   ```(?:text)?\n((?:--- a/|diff --git).*?)\n```  (generic code blocks containing patches)
+# but matched with str.find so malformed input cannot cause backtracking.
+_MD_FENCES = (
+    (('diff', 'patch'), None),
+    (('',), ('--- a/',)),
+    (('text', ''), ('--- a/', 'diff --git')),
+)
+_NEW_DEL_MODE_RE = re.compile(r'^(new|deleted) file mode \d+')
+_PATCH_LINE_PREFIXES = ('+', '-', ' ', '@@', 'index ')
+# (substring of the lower-cased git error, category), checked in order
+_VALIDATION_ERROR_TYPES = (
+    ("corrupt patch", "Corrupt patch format"),
+    ("patch does not apply", "Context mismatch"),
+    ("no such file", "Missing file"),
+    ("patch fragment without header", "Missing patch header"),
+    ("empty patch content", "No patch extracted"),
+)
+
+# Input is handed to extraction workers in blocks of whole lines of about this size
+EXTRACT_BLOCK_SIZE = 4 * 1024 * 1024
+# Log extraction progress once per this many records
+PROGRESS_INTERVAL = 10_000
+
+
+def _json_loads(data: bytes):
+    """Decode one JSONL record, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_line(obj) -> bytes:
+    """Encode one JSONL record as UTF-8 bytes with a trailing newline."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _json_indented(obj) -> bytes:
+    """Encode a report document as two-space indented UTF-8 bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def _iter_fenced_blocks(text: str, tags: Tuple[str, ...], body_prefixes: Optional[Tuple[str, ...]]) -> Iterator[str]:
+    """Yield the bodies of ```<tag> fenced blocks, scanning left to right.
+    
+    A block closes at the first following line that starts with ```, and
+    the scan resumes after that fence.
+    """
+    start = text.find('```')
+    while start >= 0:
+        tag_start = start + 3
+        body_start = -1
+        for tag in tags:
+            if text.startswith(tag + '\n', tag_start):
+                body_start = tag_start + len(tag) + 1
+                break
+        
+        if body_start >= 0 and (body_prefixes is None or text.startswith(body_prefixes, body_start)):
+            end = text.find('\n```', body_start)
+            if end < 0:
+                # No closing fence anywhere after this point
+                return
+            yield text[body_start:end]
+            start = text.find('```', end + 4)
+        else:
+            start = text.find('```', start + 1)
+
+
+def _has_patch_header(line: str) -> bool:
+    """Check for a file header anywhere in the line."""
+    return '--- a/' in line or '+++ b/' in line or 'diff --git' in line
+
+
+def _is_diff_like(line: str) -> bool:
+    """Check if a line could be part of a diff."""
+    return line.startswith(('+', '-', ' ', '@@')) or _has_patch_header(line)
+
+
 @dataclass
 class ValidationResult:
     """Result of patch validation"""
@@ -45,22 +140,32 @@ class ValidationResult:
     patch_extracted: bool = False
     patch_length: int = 0
 
+
+def _validation_error_breakdown(results: List[ValidationResult]) -> Counter:
+    """Count failed validations by error category, lower-casing each message once."""
+    breakdown = Counter()
+    for r in results:
+        if r.valid or not r.error_message:
+            continue
+        message = r.error_message.lower()
+        for needle, error_type in _VALIDATION_ERROR_TYPES:
+            if needle in message:
+                break
+        else:
+            error_type = "Other error"
+        breakdown[error_type] += 1
+    return breakdown
+
+
 class PatchExtractor:
     """Extract patches from model output text"""
     
     @staticmethod
     def extract_patch_from_markdown(text: str) -> str:
         """Extract patches from markdown code blocks."""
-        patterns = [
-            r'```(?:diff|patch)\n(.*?)\n```',
-            r'```\n(--- a/.*?)\n```',  # Patches that start with --- a/
-            r'```(?:text)?\n((?:--- a/|diff --git).*?)\n```',  # Generic code blocks containing patches
-        ]
-        
         patches = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.DOTALL | re.MULTILINE)
-            for match in matches:
+        for tags, body_prefixes in _MD_FENCES:
+            for match in _iter_fenced_blocks(text, tags, body_prefixes):
                 cleaned_patch = PatchExtractor.clean_and_validate_patch(match)
                 if cleaned_patch:
                     patches.append(cleaned_patch)
@@ -70,38 +175,37 @@ class PatchExtractor:
     @staticmethod
     def extract_raw_patch(text: str) -> str:
         """Extract patches from raw text (no markdown formatting)."""
-        lines = text.split('\n')
+        return PatchExtractor._raw_patch_from_lines(text.split('\n'))
+
+    @staticmethod
+    def _raw_patch_from_lines(lines: List[str]) -> str:
         patches = []
-        current_patch = []
-        in_patch = False
+        # Every line from start_idx onward belongs to the open patch, so it
+        # is tracked as a span and only joined once it is finalized
+        start_idx = -1
         consecutive_non_patch_lines = 0
         
-        for line in lines:
-            line_stripped = line.strip()
-            
+        def finalize(end_idx: int):
+            patch_content = '\n'.join(lines[start_idx:end_idx])
+            cleaned = PatchExtractor.clean_and_validate_patch(patch_content)
+            if cleaned:
+                patches.append(cleaned)
+        
+        for i, line in enumerate(lines):
             # Check for patch start indicators
             if PatchExtractor.is_patch_start(line):
                 # If we were already in a patch, save the current one
-                if in_patch and current_patch:
-                    patch_content = '\n'.join(current_patch)
-                    cleaned = PatchExtractor.clean_and_validate_patch(patch_content)
-                    if cleaned:
-                        patches.append(cleaned)
+                if start_idx >= 0:
+                    finalize(i)
                 
                 # Start new patch
-                current_patch = [line]
-                in_patch = True
+                start_idx = i
                 consecutive_non_patch_lines = 0
                 continue
             
-            if in_patch:
-                # Check if this looks like a patch line
-                if PatchExtractor.is_patch_line(line):
-                    current_patch.append(line)
-                    consecutive_non_patch_lines = 0
-                elif line_stripped == "":
-                    # Empty lines are okay in patches
-                    current_patch.append(line)
+            if start_idx >= 0:
+                # Check if this looks like a patch line; empty lines are okay in patches
+                if PatchExtractor.is_patch_line(line) or not line.strip():
                     consecutive_non_patch_lines = 0
                 else:
                     consecutive_non_patch_lines += 1
@@ -109,48 +213,36 @@ class PatchExtractor:
                     # If we hit too many consecutive non-patch lines, end the patch
                     if consecutive_non_patch_lines >= 3:
                         # Don't include the non-patch lines in the final patch
-                        final_patch = current_patch[:-consecutive_non_patch_lines+1] if consecutive_non_patch_lines > 1 else current_patch
-                        patch_content = '\n'.join(final_patch)
-                        cleaned = PatchExtractor.clean_and_validate_patch(patch_content)
-                        if cleaned:
-                            patches.append(cleaned)
-                        
-                        current_patch = []
-                        in_patch = False
+                        finalize(i - consecutive_non_patch_lines + 1)
+                        start_idx = -1
                         consecutive_non_patch_lines = 0
-                    else:
-                        # Include this line for now, might be part of the patch
-                        current_patch.append(line)
         
         # Handle any remaining patch
-        if in_patch and current_patch:
+        if start_idx >= 0:
             # Remove trailing non-patch lines
-            while current_patch and not PatchExtractor.is_patch_line(current_patch[-1]) and current_patch[-1].strip() != "":
-                current_patch.pop()
+            end_idx = len(lines)
+            while end_idx > start_idx and not PatchExtractor.is_patch_line(lines[end_idx - 1]) and lines[end_idx - 1].strip() != "":
+                end_idx -= 1
             
-            if current_patch:
-                patch_content = '\n'.join(current_patch)
-                cleaned = PatchExtractor.clean_and_validate_patch(patch_content)
-                if cleaned:
-                    patches.append(cleaned)
+            if end_idx > start_idx:
+                finalize(end_idx)
         
         return '\n'.join(patches) if patches else ""
 
     @staticmethod
     def extract_diff_like_content(text: str) -> str:
         """Fallback: extract any content that looks diff-like."""
-        lines = text.split('\n')
-        diff_lines = []
+        return PatchExtractor._diff_like_from_lines(text.split('\n'))
+
+    @staticmethod
+    def _diff_like_from_lines(lines: List[str]) -> str:
+        # Nothing is collected before the first diff-like line
+        first = next((i for i, line in enumerate(lines) if _is_diff_like(line)), -1)
+        if first < 0:
+            return ""
         
-        for line in lines:
-            # Look for lines that could be part of a diff
-            if (line.startswith(('+', '-', ' ', '@@')) or 
-                '--- a/' in line or '+++ b/' in line or 
-                'diff --git' in line):
-                diff_lines.append(line)
-            elif diff_lines and line.strip() == "":
-                # Include empty lines if we're collecting diff content
-                diff_lines.append(line)
+        # From there on, keep diff-like lines and the empty lines between them
+        diff_lines = [line for line in lines[first:] if _is_diff_like(line) or not line.strip()]
         
         if diff_lines:
             return PatchExtractor.clean_and_validate_patch('\n'.join(diff_lines))
@@ -160,8 +252,8 @@ class PatchExtractor:
     @staticmethod
     def is_patch_start(line: str) -> bool:
         """Check if line indicates the start of a patch."""
-        indicators = ['diff --git', '--- a/', '+++ b/', '@@']
-        return any(indicator in line for indicator in indicators)
+        return ('diff --git' in line or '--- a/' in line or
+                '+++ b/' in line or '@@' in line)
 
     @staticmethod
     def is_patch_line(line: str) -> bool:
@@ -169,20 +261,16 @@ class PatchExtractor:
         if not line:
             return True  # Empty lines are valid in patches
         
-        # Standard patch line prefixes
-        if line.startswith(('+', '-', ' ', '@@')):
+        # Standard patch line prefixes and index lines in git patches
+        if line.startswith(_PATCH_LINE_PREFIXES):
             return True
         
         # Patch headers
-        if any(indicator in line for indicator in ['--- a/', '+++ b/', 'diff --git']):
-            return True
-        
-        # Index lines in git patches
-        if line.startswith('index '):
+        if _has_patch_header(line):
             return True
         
         # File mode changes
-        if re.match(r'^(new|deleted) file mode \d+', line):
+        if line[0] in 'nd' and _NEW_DEL_MODE_RE.match(line):
             return True
         
         return False
@@ -210,12 +298,14 @@ class PatchExtractor:
         
         for line in lines:
             # Look for patch headers
-            if any(indicator in line for indicator in ['--- a/', '+++ b/', 'diff --git']):
+            if _has_patch_header(line):
                 has_patch_header = True
+                break
             
             # Look for hunk headers or changes
-            if line.startswith('@@') or (line.startswith(('+', '-')) and len(line) > 1):
+            if line.startswith('@@') or (len(line) > 1 and line[0] in '+-'):
                 has_hunks = True
+                break
         
         # Must have either patch headers or actual changes
         if not (has_patch_header or has_hunks):
@@ -237,18 +327,29 @@ class PatchExtractor:
         if not text or not text.strip():
             return ""
         
+        # Each pass is skipped when the text lacks the literal it needs to match
         # First, try to extract from markdown code blocks
-        markdown_patch = PatchExtractor.extract_patch_from_markdown(text)
-        if markdown_patch:
-            return markdown_patch
+        if '```' in text:
+            markdown_patch = PatchExtractor.extract_patch_from_markdown(text)
+            if markdown_patch:
+                return markdown_patch
         
-        # If no markdown blocks, try to extract raw patch content
-        raw_patch = PatchExtractor.extract_raw_patch(text)
-        if raw_patch:
-            return raw_patch
+        # The line-based passes below share a single split of the text
+        lines = None
         
-        # Fallback: look for any diff-like content
-        return PatchExtractor.extract_diff_like_content(text)
+        # If no markdown blocks, try to extract raw patch content
+        if PatchExtractor.is_patch_start(text):
+            lines = text.split('\n')
+            raw_patch = PatchExtractor._raw_patch_from_lines(lines)
+            if raw_patch:
+                return raw_patch
+        
+        # Fallback: look for any diff-like content; it needs a +/- change or hunk line
+        if '+' not in text and '-' not in text and '@@' not in text:
+            return ""
+        if lines is None:
+            lines = text.split('\n')
+        return PatchExtractor._diff_like_from_lines(lines)
 
 
 class PatchValidator:
@@ -358,6 +459,98 @@ class PatchValidator:
                 pass
 
 
+def _iter_line_blocks(infile: BinaryIO, block_size: int = EXTRACT_BLOCK_SIZE) -> Iterator[Tuple[bytes, int]]:
+    """Read a binary file in blocks cut at line boundaries.
+    
+    Yields (block, first_line_num) pairs with 1-based line numbers.
+    """
+    line_num = 1
+    carry = b''
+    while True:
+        chunk = infile.read(block_size)
+        if not chunk:
+            break
+        if carry:
+            chunk = carry + chunk
+        cut = chunk.rfind(b'\n') + 1
+        if cut == 0:
+            carry = chunk
+            continue
+        block, carry = chunk[:cut], chunk[cut:]
+        yield block, line_num
+        line_num += block.count(b'\n')
+    if carry:
+        yield carry, line_num
+
+
+def _extract_block(block: bytes, first_line_num: int, overwrite_existing: bool) -> Tuple[bytes, int, int, int]:
+    """Extract patches for every record in a block of JSONL lines.
+    
+    Module-level so it can run in a worker process. Returns the rewritten
+    block and its (processed, extracted, skipped) counts.
+    """
+    output = []
+    processed_count = 0
+    extracted_count = 0
+    skipped_count = 0
+    
+    for line_num, line in enumerate(io.BytesIO(block), first_line_num):
+        if not line.strip():
+            output.append(line)
+            continue
+        
+        # Records that already carry a generated_patch key are copied through
+        # byte-for-byte. Inside a JSON string the quotes would be escaped, so the
+        # literal only matches an object key (prediction records are flat)
+        if not overwrite_existing and b'"generated_patch"' in line:
+            processed_count += 1
+            skipped_count += 1
+            output.append(line)
+            continue
+        
+        try:
+            data = _json_loads(line)
+            processed_count += 1
+            
+            # Skip if generated_patch already exists and not overwriting
+            if 'generated_patch' in data and not overwrite_existing:
+                skipped_count += 1
+                output.append(_json_line(data))
+                continue
+            
+            # Extract patch from full_output
+            full_output = data.get('full_output', '')
+            extracted_patch = PatchExtractor.extract_patch(full_output)
+            
+            # Update the data with extracted patch
+            data['generated_patch'] = extracted_patch
+            
+            if extracted_patch:
+                extracted_count += 1
+            
+            output.append(_json_line(data))
+                
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse JSON on line {line_num}: {e}")
+            output.append(line)
+        except Exception as e:
+            logger.warning(f"Error processing line {line_num}: {e}")
+            output.append(line)
+    
+    return b''.join(output), processed_count, extracted_count, skipped_count
+
+
+def _map_ordered(executor: ProcessPoolExecutor, fn, arg_tuples, window: int) -> Iterator:
+    """Like executor.map, but keeps at most `window` calls in flight."""
+    pending = deque()
+    for args in arg_tuples:
+        pending.append(executor.submit(fn, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
 class PatchProcessor:
     """Main processor that combines extraction and validation"""
     
@@ -366,8 +559,13 @@ class PatchProcessor:
         self.extractor = PatchExtractor()
         self.validator = PatchValidator(verbose=verbose)
     
-    def extract_patches(self, input_file: str, output_file: str, overwrite_existing: bool = False):
-        """Extract patches from JSONL file"""
+    def extract_patches(self, input_file: str, output_file: str, overwrite_existing: bool = False,
+                        max_workers: Optional[int] = None):
+        """Extract patches from JSONL file
+        
+        Records are processed in blocks across up to max_workers processes
+        (default: CPU count); output keeps the input order.
+        """
         input_path = Path(input_file)
         output_path = Path(output_file)
         
@@ -379,55 +577,62 @@ class PatchProcessor:
         processed_count = 0
         extracted_count = 0
         skipped_count = 0
+        next_progress = PROGRESS_INTERVAL
+        
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        # A single block gains nothing from a process pool
+        if input_path.stat().st_size <= EXTRACT_BLOCK_SIZE:
+            max_workers = 1
         
         logger.info(f"Extracting patches from {input_file}...")
         
-        with open(input_path, 'r', encoding='utf-8') as infile, \
-             open(output_path, 'w', encoding='utf-8') as outfile:
-            
-            for line_num, line in enumerate(infile, 1):
-                original_line = line
-                line = line.strip()
+        # Write next to the output and move into place at the end, so the output
+        # may be the input file itself (in-place rewrite)
+        fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+        # Own the descriptor right away so every failure below closes it
+        outfile = os.fdopen(fd, 'wb')
+        try:
+            with outfile, open(input_path, 'rb') as infile:
+                shutil.copymode(input_path, tmp_name)
+                # Map the input so blocks are paged in on demand instead of copied
+                # through a read buffer (empty files cannot be mapped)
+                if input_path.stat().st_size:
+                    source = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    source = infile
                 
-                if not line:
-                    outfile.write(original_line)
-                    continue
+                jobs = ((block, line_num, overwrite_existing) for block, line_num in _iter_line_blocks(source))
+                
+                if max_workers > 1:
+                    pool = ProcessPoolExecutor(max_workers=max_workers)
+                    results = _map_ordered(pool, _extract_block, jobs, window=max_workers * 2)
+                else:
+                    pool = None
+                    results = (_extract_block(*job) for job in jobs)
                 
                 try:
-                    data = json.loads(line)
-                    processed_count += 1
-                    
-                    # Skip if generated_patch already exists and not overwriting
-                    if 'generated_patch' in data and not overwrite_existing:
-                        skipped_count += 1
-                        outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
-                        continue
-                    
-                    # Extract patch from full_output
-                    full_output = data.get('full_output', '')
-                    extracted_patch = self.extractor.extract_patch(full_output)
-                    
-                    # Update the data with extracted patch
-                    data['generated_patch'] = extracted_patch
-                    
-                    if extracted_patch:
-                        extracted_count += 1
-                    
-                    # Write updated data to output file
-                    outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
-                    
-                    # Progress indicator
-                    if processed_count % 100 == 0:
-                        logger.info(f"Processed {processed_count} records...")
+                    for output, processed, extracted, skipped in results:
+                        outfile.write(output)
+                        processed_count += processed
+                        extracted_count += extracted
+                        skipped_count += skipped
                         
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse JSON on line {line_num}: {e}")
-                    outfile.write(original_line)
-                    continue
-                except Exception as e:
-                    logger.warning(f"Error processing line {line_num}: {e}")
-                    outfile.write(original_line)
-                    continue
+                        # Progress indicator
+                        if processed_count >= next_progress:
+                            logger.info(f"Processed {processed_count} records...")
+                            next_progress = (processed_count // PROGRESS_INTERVAL + 1) * PROGRESS_INTERVAL
+                finally:
+                    if pool is not None:
+                        pool.shutdown(cancel_futures=True)
+                    if source is not infile:
+                        source.close()
+            
+            os.replace(tmp_name, output_path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
         
         logger.info(f"Extraction complete!")
         logger.info(f"Total records processed: {processed_count}")
@@ -443,10 +648,10 @@ class PatchProcessor:
         # Load predictions
         logger.info(f"Loading predictions from {predictions_file}")
         predictions = {}
-        with open(predictions_file, 'r') as f:
+        with open(predictions_file, 'rb') as f:
             for line in f:
                 if line.strip():
-                    pred = json.loads(line)
+                    pred = _json_loads(line)
                     # Accept files with either 'generated_patch' (extracted) or 'full_output' (raw)
                     if 'instance_id' in pred:
                         # If no generated_patch, try to extract from full_output on the fly
@@ -459,10 +664,10 @@ class PatchProcessor:
         # Load dataset
         logger.info(f"Loading dataset from {dataset_file}")
         dataset = {}
-        with open(dataset_file, 'r') as f:
+        with open(dataset_file, 'rb') as f:
             for line in f:
                 if line.strip():
-                    entry = json.loads(line)
+                    entry = _json_loads(line)
                     if 'instance_id' in entry:
                         # Convert repo field to URL if needed
                         if 'repo' in entry and not entry['repo'].startswith('https://'):
@@ -562,28 +767,11 @@ class PatchProcessor:
         logger.info(f"Failed patches: {total-valid} ({(total-valid)/total*100:.1f}%)")
         
         # Show common error patterns
-        error_patterns = {}
-        for r in results:
-            if not r.valid and r.error_message:
-                # Extract error type
-                if "corrupt patch" in r.error_message.lower():
-                    error_type = "Corrupt patch format"
-                elif "patch does not apply" in r.error_message.lower():
-                    error_type = "Context mismatch"
-                elif "no such file" in r.error_message.lower():
-                    error_type = "Missing file"
-                elif "patch fragment without header" in r.error_message.lower():
-                    error_type = "Missing patch header"
-                elif "empty patch content" in r.error_message.lower():
-                    error_type = "No patch extracted"
-                else:
-                    error_type = "Other error"
-                
-                error_patterns[error_type] = error_patterns.get(error_type, 0) + 1
+        error_patterns = _validation_error_breakdown(results)
         
         if error_patterns:
             logger.info("\nError breakdown:")
-            for error_type, count in sorted(error_patterns.items(), key=lambda x: x[1], reverse=True):
+            for error_type, count in error_patterns.most_common():
                 logger.info(f"  {error_type}: {count}")
     
     def _save_validation_report(self, results: List[ValidationResult], report_file: str):
@@ -595,23 +783,7 @@ class PatchProcessor:
         extracted = sum(1 for r in results if r.patch_extracted)
         
         # Error breakdown
-        error_patterns = {}
-        for r in results:
-            if not r.valid and r.error_message:
-                if "corrupt patch" in r.error_message.lower():
-                    error_type = "Corrupt patch format"
-                elif "patch does not apply" in r.error_message.lower():
-                    error_type = "Context mismatch"
-                elif "no such file" in r.error_message.lower():
-                    error_type = "Missing file"
-                elif "patch fragment without header" in r.error_message.lower():
-                    error_type = "Missing patch header"
-                elif "empty patch content" in r.error_message.lower():
-                    error_type = "No patch extracted"
-                else:
-                    error_type = "Other error"
-                
-                error_patterns[error_type] = error_patterns.get(error_type, 0) + 1
+        error_patterns = dict(_validation_error_breakdown(results))
         
         report_data = {
             "summary": {
@@ -635,8 +807,8 @@ class PatchProcessor:
             ]
         }
         
-        with open(report_file, 'w') as f:
-            json.dump(report_data, f, indent=2)
+        with open(report_file, 'wb') as f:
+            f.write(_json_indented(report_data))
 
 def generate_output_filename(input_file: str, suffix: str = "_processed") -> str:
     """Generate output filename based on input filename"""
@@ -654,6 +826,8 @@ def generate_report_filename(input_file: str, suffix: str = "_validation_report"
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     parser = argparse.ArgumentParser(
         description="Consolidated patch extraction and validation for Mobile Bench",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -683,6 +857,8 @@ Examples:
     extract_parser.add_argument('output_file', nargs='?', help='Output JSONL file with extracted patches (auto-generated if not specified)')
     extract_parser.add_argument('--overwrite-existing', action='store_true',
                                help='Overwrite existing generated_patch fields')
+    extract_parser.add_argument('--workers', type=int,
+                               help='Number of extraction processes (default: CPU count)')
     
     # Validate command
     validate_parser = subparsers.add_parser('validate', help='Validate existing patches')
@@ -721,7 +897,7 @@ Examples:
             # Auto-generate output filename if not provided
             output_file = args.output_file or generate_output_filename(args.input_file, "_extracted")
             logger.info(f"Output will be saved to: {output_file}")
-            processor.extract_patches(args.input_file, output_file, args.overwrite_existing)
+            processor.extract_patches(args.input_file, output_file, args.overwrite_existing, args.workers)
             
         elif args.command == 'validate':
             # Auto-generate report filename if not provided
@@ -5,13 +5,43 @@ Results reporting and analysis utilities for Android-bench.
 
 import json
 import logging
+import re
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Error keywords mapped to (priority, category); lower priority wins when
+# several keywords occur in the same message
+_ERROR_KEYWORDS = {
+    "clone": (0, "Repository Clone Error"),
+    "repository": (0, "Repository Clone Error"),
+    "docker": (1, "Container Error"),
+    "container": (1, "Container Error"),
+    "patch": (2, "Patch Application Error"),
+    "build": (3, "Build Error"),
+    "gradle": (3, "Build Error"),
+    "test": (4, "Test Execution Error"),
+    "timeout": (5, "Timeout Error"),
+}
+# Lookahead so overlapping keywords (e.g. "buildocker") are all reported
+_ERROR_KEYWORD_RE = re.compile("(?=(" + "|".join(_ERROR_KEYWORDS) + "))")
+
+
+def _categorize_error(error_message: str) -> str:
+    """Categorize error messages into types."""
+    best = None
+    for match in _ERROR_KEYWORD_RE.finditer(error_message.lower()):
+        ranked = _ERROR_KEYWORDS[match.group(1)]
+        if best is None or ranked[0] < best[0]:
+            best = ranked
+            if best[0] == 0:
+                break
+    return best[1] if best else "Other Error"
+
 
 @dataclass
 class TestStatistics:
@@ -76,6 +106,58 @@ class InstanceResult:
         )
 
 
+@dataclass
+class RunTotals:
+    """Aggregate counters for a run, accumulated in a single pass."""
+    total_instances: int = 0
+    successful: int = 0
+    total_tests: int = 0
+    total_passed: int = 0
+    total_failed: int = 0
+    total_skipped: int = 0
+    total_errors: int = 0
+    timed_instances: int = 0
+    total_duration: float = 0.0
+    successful_results: List[InstanceResult] = field(default_factory=list)
+    # Failed instances by error category (see _categorize_error)
+    error_counts: Counter = field(default_factory=Counter)
+    
+    @classmethod
+    def from_results(cls, results: Iterable[InstanceResult]):
+        totals = cls()
+        for result in results:
+            totals.total_instances += 1
+            if result.duration > 0:
+                totals.timed_instances += 1
+                totals.total_duration += result.duration
+            if not result.success:
+                if result.error_message:
+                    totals.error_counts[_categorize_error(result.error_message)] += 1
+                continue
+            totals.successful += 1
+            stats = result.test_stats
+            if stats:
+                totals.successful_results.append(result)
+                totals.total_tests += stats.total_tests
+                totals.total_passed += stats.passed
+                totals.total_failed += stats.failed
+                totals.total_skipped += stats.skipped
+                totals.total_errors += stats.errors
+        return totals
+    
+    @property
+    def success_rate(self) -> float:
+        return (self.successful / self.total_instances * 100) if self.total_instances > 0 else 0
+    
+    @property
+    def test_pass_rate(self) -> float:
+        return (self.total_passed / self.total_tests * 100) if self.total_tests > 0 else 0
+    
+    @property
+    def avg_duration(self) -> float:
+        return self.total_duration / self.timed_instances if self.timed_instances else 0
+
+
 class AndroidBenchReporter:
     """Generates reports and analysis for Android-bench evaluation results."""
     
@@ -115,38 +197,26 @@ class AndroidBenchReporter:
         """Generate a comprehensive summary report for a run."""
         results = self.load_run_results(run_id)
         
-        # Basic statistics
-        total_instances = len(results)
-        successful = len([r for r in results.values() if r.success])
+        # Basic, test (successful runs only) and duration statistics
+        totals = RunTotals.from_results(results.values())
+        total_instances = totals.total_instances
+        successful = totals.successful
         failed = total_instances - successful
-        success_rate = (successful / total_instances * 100) if total_instances > 0 else 0
-        
-        # Test statistics (only for successful runs)
-        successful_results = [r for r in results.values() if r.success and r.test_stats]
+        success_rate = totals.success_rate
+        successful_results = totals.successful_results
         
-        if successful_results:
-            total_tests = sum(r.test_stats.total_tests for r in successful_results)
-            total_passed = sum(r.test_stats.passed for r in successful_results)
-            total_failed = sum(r.test_stats.failed for r in successful_results)
-            total_skipped = sum(r.test_stats.skipped for r in successful_results)
-            total_errors = sum(r.test_stats.errors for r in successful_results)
-            overall_pass_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
-        else:
-            total_tests = total_passed = total_failed = total_skipped = total_errors = 0
-            overall_pass_rate = 0
+        total_tests = totals.total_tests
+        total_passed = totals.total_passed
+        total_failed = totals.total_failed
+        total_skipped = totals.total_skipped
+        total_errors = totals.total_errors
+        overall_pass_rate = totals.test_pass_rate
         
-        # Duration statistics
-        durations = [r.duration for r in results.values() if r.duration > 0]
-        avg_duration = sum(durations) / len(durations) if durations else 0
-        total_duration = sum(durations)
+        avg_duration = totals.avg_duration
+        total_duration = totals.total_duration
         
-        # Error analysis
-        error_counts = {}
-        for result in results.values():
-            if not result.success and result.error_message:
-                # Categorize errors
-                error_type = self._categorize_error(result.error_message)
-                error_counts[error_type] = error_counts.get(error_type, 0) + 1
+        # Error analysis (categorized during the totals pass)
+        error_counts = totals.error_counts
         
         # Generate report
         report_lines = [
@@ -182,7 +252,7 @@ class AndroidBenchReporter:
                 "❌ Error Analysis",
                 "-" * 15,
             ])
-            for error_type, count in sorted(error_counts.items(), key=lambda x: x[1], reverse=True):
+            for error_type, count in error_counts.most_common():
                 percentage = (count / failed * 100) if failed > 0 else 0
                 report_lines.append(f"{error_type}: {count} ({percentage:.1f}%)")
             report_lines.append("")
@@ -312,25 +382,6 @@ class AndroidBenchReporter:
         
         return "\n".join(report_lines)
     
-    def _categorize_error(self, error_message: str) -> str:
-        """Categorize error messages into types."""
-        error_lower = error_message.lower()
-        
-        if "clone" in error_lower or "repository" in error_lower:
-            return "Repository Clone Error"
-        elif "docker" in error_lower or "container" in error_lower:
-            return "Container Error"
-        elif "patch" in error_lower:
-            return "Patch Application Error"
-        elif "build" in error_lower or "gradle" in error_lower:
-            return "Build Error"
-        elif "test" in error_lower:
-            return "Test Execution Error"
-        elif "timeout" in error_lower:
-            return "Timeout Error"
-        else:
-            return "Other Error"
-    
     def generate_comparison_report(self, run_ids: List[str]) -> str:
         """Generate a comparison report between multiple runs."""
         if len(run_ids) < 2:
@@ -358,31 +409,15 @@ class AndroidBenchReporter:
         # Create comparison table
         comparison_data = []
         for run_id, results in run_results.items():
-            total = len(results)
-            successful = len([r for r in results.values() if r.success])
-            success_rate = (successful / total * 100) if total > 0 else 0
-            
-            # Test statistics
-            successful_results = [r for r in results.values() if r.success and r.test_stats]
-            if successful_results:
-                total_tests = sum(r.test_stats.total_tests for r in successful_results)
-                total_passed = sum(r.test_stats.passed for r in successful_results)
-                test_pass_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
-            else:
-                total_tests = 0
-                test_pass_rate = 0
-            
-            # Duration
-            durations = [r.duration for r in results.values() if r.duration > 0]
-            avg_duration = sum(durations) / len(durations) if durations else 0
+            totals = RunTotals.from_results(results.values())
             
             comparison_data.append({
                 'Run ID': run_id,
-                'Total Instances': total,
-                'Success Rate (%)': f"{success_rate:.1f}",
-                'Total Tests': total_tests,
-                'Test Pass Rate (%)': f"{test_pass_rate:.1f}",
-                'Avg Duration (s)': f"{avg_duration:.1f}"
+                'Total Instances': totals.total_instances,
+                'Success Rate (%)': f"{totals.success_rate:.1f}",
+                'Total Tests': totals.total_tests,
+                'Test Pass Rate (%)': f"{totals.test_pass_rate:.1f}",
+                'Avg Duration (s)': f"{totals.avg_duration:.1f}"
             })
         
         # Convert to DataFrame for better formatting
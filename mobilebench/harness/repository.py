@@ -66,8 +66,8 @@ class AndroidRepositoryManager:
                 if exit_code != 0:
                     logger.warning(f"Git config command failed: {cmd}")
             
-            # Clone with specific depth
-            clone_cmd = f"git clone --depth 100 {clone_url} {repo_path}"
+            # Blobless clone: full history, file contents fetched on checkout
+            clone_cmd = f"git clone --filter=blob:none --no-tags {clone_url} {repo_path}"
             exit_code = os.system(clone_cmd)
             
             if exit_code != 0:
@@ -84,10 +84,9 @@ class AndroidRepositoryManager:
                 exit_code = os.system(checkout_cmd)
                 
                 if exit_code != 0:
-                    # If shallow clone doesn't have the commit, fetch more
-                    logger.info(f"Base commit not found in shallow clone, fetching more history")
-                    fetch_cmd = "git fetch --unshallow"
-                    fetch_exit = os.system(fetch_cmd)
+                    # The commit may not be on a branch (e.g. only reachable from a PR ref)
+                    logger.info(f"Base commit not found in clone, fetching it directly")
+                    fetch_exit = os.system(f"git fetch origin {base_commit}")
                     
                     if fetch_exit != 0:
                         # Try regular fetch
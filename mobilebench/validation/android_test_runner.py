@@ -17,6 +17,7 @@ Usage:
 """
 
 import csv
+import io
 import json
 import os
 import re
@@ -28,8 +29,45 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 
+try:
+    from lxml import etree as XMLTree
+except ImportError:
+    import xml.etree.ElementTree as XMLTree
+
+# Version in a Gradle distribution URL, e.g. gradle-8.2.1-bin.zip
+_GRADLE_VERSION_RE = re.compile(r'gradle-(\d+\.\d+(?:\.\d+)?)-')
+
+# Directories that never hold project sources
+_NON_SOURCE_DIRS = frozenset({".git", ".gradle", "build", "node_modules"})
+
 
 class AndroidTestRunner:
+    # docker run options for containers that build and test
+    _TEST_RUN_ARGS = (
+        "--network", "host",
+        "--dns", "8.8.8.8",
+        "--dns", "8.8.4.4",
+        "-e", "HOME=/tmp",  # Use /tmp as home to avoid permission issues
+        "-e", "GRADLE_USER_HOME=/tmp/.gradle",  # Set Gradle home to /tmp
+        # Named volume so Gradle distributions and dependencies survive across runs
+        "-v", "mobilebench-gradle-home:/tmp/.gradle",
+    )
+    
+    # Run as root in the repo: drop build outputs and hand the tree back to the host user
+    _RELEASE_BUILD_OUTPUTS = """find . -name "build" -type d -exec rm -rf {} + 2>/dev/null || true &&
+find . -name ".gradle" -type d -exec rm -rf {} + 2>/dev/null || true &&
+rm -rf build/ app/build/ */build/ .gradle/ 2>/dev/null || true &&
+echo "Fixing ownership of remaining files..." &&
+chown -R $(stat -c '%u:%g' .) . 2>/dev/null || chown -R 1000:1000 . 2>/dev/null || true &&
+chmod -R u+rwX . 2>/dev/null || true"""
+    
+    # JUnit reports echoed by the test script, one section per TEST-*.xml file
+    _XML_SECTION_RE = re.compile(r'=== XML FILE START: (.+?) ===\n(.*?)=== XML FILE END: ', re.DOTALL)
+    
+    # Fallback for reports that do not parse; the body is captured with the match
+    _TESTCASE_RE = re.compile(r'<testcase\b([^>]*?)(?:/>|>(.*?)</testcase>)', re.DOTALL)
+    _ATTR_RE = re.compile(r'\b(name|classname)="([^"]*)"')
+    
     def __init__(self, docker_image="mingc/android-build-box", timeout_minutes=10, preferred_variant="debug", docker_context=None, custom_java_version=None, github_token=None):
         self.docker_image = docker_image
         self.timeout_seconds = timeout_minutes * 60
@@ -39,6 +77,7 @@ class AndroidTestRunner:
         self.docker_context = docker_context  # Docker context to use
         self.custom_java_version = custom_java_version  # Override auto-detection
         self.github_token = github_token  # GitHub token for private packages
+        self.worker_container = None  # Long-lived container name, see start_worker_container
         
     def _get_docker_cmd_prefix(self):
         """Get Docker command prefix with context if specified."""
@@ -46,6 +85,69 @@ class AndroidTestRunner:
             return ["docker", "--context", self.docker_context]
         else:
             return ["docker"]
+    
+    def _docker_bash_cmd(self, repo_dir: Path, script: str, run_args: Tuple[str, ...] = ()) -> List[str]:
+        """
+        Build the command that runs a bash script as root inside repo_dir.
+        
+        Uses docker exec in the worker container when it is up, otherwise a
+        one-off container with repo_dir mounted at /project.
+        """
+        docker_cmd_prefix = self._get_docker_cmd_prefix()
+        repo_abs_path = repo_dir.absolute()
+        
+        if self.worker_container and self.work_dir:
+            try:
+                rel_path = repo_abs_path.relative_to(self.work_dir.absolute())
+            except ValueError:
+                rel_path = None
+            if rel_path is not None:
+                return docker_cmd_prefix + [
+                    "exec", "-w", f"/workspace/{rel_path.as_posix()}",
+                    self.worker_container, "bash", "-c", script
+                ]
+        
+        return docker_cmd_prefix + [
+            "run", "--rm", *run_args,
+            "-v", f"{repo_abs_path}:/project", "-w", "/project",
+            self.docker_image, "bash", "-c", script
+        ]
+    
+    def start_worker_container(self):
+        """Start one long-lived container that serves every docker step of the run."""
+        name = f"android-test-runner-{os.getpid()}"
+        docker_cmd = self._get_docker_cmd_prefix() + [
+            "run", "-d", "--rm", "--name", name,
+            *self._TEST_RUN_ARGS,
+            "-v", f"{self.work_dir.absolute()}:/workspace",
+            self.docker_image, "sleep", "infinity"
+        ]
+        
+        try:
+            result = subprocess.run(docker_cmd, capture_output=True, text=True, timeout=120)
+        except Exception as e:
+            print(f"Could not start worker container, using one container per step: {e}")
+            return
+        
+        if result.returncode == 0:
+            self.worker_container = name
+            print(f"Started worker container: {name}")
+        else:
+            print(f"Could not start worker container, using one container per step: {result.stderr}")
+    
+    def stop_worker_container(self):
+        """Stop and remove the worker container, if one was started."""
+        if not self.worker_container:
+            return
+        try:
+            subprocess.run(
+                self._get_docker_cmd_prefix() + ["rm", "-f", self.worker_container],
+                capture_output=True, text=True, timeout=60
+            )
+            print(f"Removed worker container: {self.worker_container}")
+        except Exception as e:
+            print(f"Failed to remove worker container {self.worker_container}: {e}")
+        self.worker_container = None
         
     def setup_workspace(self):
         """Create and setup the workspace directory."""
@@ -257,9 +359,11 @@ class AndroidTestRunner:
             # Ensure parent directory exists
             repo_dir.parent.mkdir(parents=True, exist_ok=True)
             
-            # Clone with specific options for better submodule handling
+            # Blobless clone: full commit history so any base commit can be checked
+            # out, with file contents fetched only for the commits actually used
             subprocess.run([
-                "git", "clone", "--recursive", "--depth", "1000", repo_url, str(repo_dir)
+                "git", "clone", "--filter=blob:none", "--no-tags",
+                "--recurse-submodules", "--shallow-submodules", repo_url, str(repo_dir)
             ], check=True, timeout=600)  # 10 minute timeout
             
             # Verify the clone was successful
@@ -297,7 +401,7 @@ class AndroidTestRunner:
         if gradle_props.exists():
             try:
                 content = gradle_props.read_text()
-                match = re.search(r'gradle-(\d+\.\d+(?:\.\d+)?)-', content)
+                match = _GRADLE_VERSION_RE.search(content)
                 if match:
                     version = match.group(1)
                     print(f"Detected Gradle version: {version}")
@@ -319,7 +423,7 @@ class AndroidTestRunner:
             if alt_location.exists():
                 try:
                     content = alt_location.read_text()
-                    match = re.search(r'gradle-(\d+\.\d+(?:\.\d+)?)-', content)
+                    match = _GRADLE_VERSION_RE.search(content)
                     if match:
                         version = match.group(1)
                         print(f"Detected Gradle version from {alt_location}: {version}")
@@ -349,14 +453,16 @@ class AndroidTestRunner:
                 except Exception:
                     pass
         
-        # Check for .kt or .kts files
-        for kt_file in repo_dir.rglob("*.kt"):
-            print("Kotlin files detected")
-            return True
-            
-        for kts_file in repo_dir.rglob("*.kts"):
-            print("Kotlin script files detected")
-            return True
+        # Check for .kt or .kts files in one walk, skipping VCS and build output
+        for dirpath, dirnames, filenames in os.walk(repo_dir):
+            dirnames[:] = [d for d in dirnames if d not in _NON_SOURCE_DIRS]
+            for filename in filenames:
+                if filename.endswith(".kt"):
+                    print("Kotlin files detected")
+                    return True
+                if filename.endswith(".kts"):
+                    print("Kotlin script files detected")
+                    return True
             
         return False
     
@@ -490,25 +596,23 @@ class AndroidTestRunner:
 
     def run_docker_tests(self, repo_dir: Path, commit_sha: str, java_version: str, label: str) -> Tuple[Dict[str, str], Dict[str, int]]:
         """Run tests in Docker container and return test results with statistics."""
-        repo_abs_path = repo_dir.absolute()
-        
         # Detect and choose test variant
         variants = self.detect_test_variants(repo_dir)
         test_task = self.choose_preferred_variant(variants)
         
         # Docker command to run tests
-        docker_cmd_prefix = self._get_docker_cmd_prefix()
-        docker_cmd = docker_cmd_prefix + [
-            "run", "--rm",
-            "--network", "host",
-            "--dns", "8.8.8.8", 
-            "--dns", "8.8.4.4",
-            "-v", f"{repo_abs_path}:/project",
-            "-e", f"HOME=/tmp",  # Use /tmp as home to avoid permission issues
-            "-e", f"GRADLE_USER_HOME=/tmp/.gradle",  # Set Gradle home to /tmp
-            self.docker_image,
-            "bash", "-c", f"""
-cd /project &&
+        test_script = f"""
+# Release build outputs however the script ends, so cleanup_repo needs no
+# extra container; the script still exits with the status of the test steps
+REPO_DIR=$(pwd)
+release_build_outputs() {{
+    echo "=== Releasing build outputs ==="
+    cd "$REPO_DIR" &&
+    {self._RELEASE_BUILD_OUTPUTS}
+}}
+trap 'test_status=$?; release_build_outputs; echo "=== Release exit status: $? ==="; exit $test_status' EXIT
+trap 'exit 143' TERM INT HUP
+
 echo "=== Container environment ready ===" &&
 echo "=== Checking out commit {commit_sha} ===" &&
 
@@ -584,7 +688,6 @@ rm -rf build/ || true &&
 rm -rf app/build/ || true &&
 rm -rf */build/ || true &&
 rm -rf .gradle/ || true &&
-rm -rf /tmp/.gradle/caches/ || true &&
 rm -rf /tmp/.gradle/daemon/ || true &&
 
 echo "=== Configuring Gradle ===" &&
@@ -599,7 +702,9 @@ echo 'android.useAndroidX=true' >> /tmp/.gradle/gradle.properties &&
 
 echo "=== Killing any existing Gradle daemons ===" &&
 ./gradlew --stop 2>/dev/null || true &&
-pkill -f gradle 2>/dev/null || true &&
+# Match Gradle JVM main classes only: under docker exec this shell is not PID 1,
+# and a plain "gradle" pattern would match its own command line and kill it
+pkill -f '[G]radleDaemon|[G]radleWrapperMain|[G]radleMain' 2>/dev/null || true &&
 
 echo "=== Running Gradle tests with multiple tasks ===" &&
 if [ -f './gradlew' ]; then
@@ -633,7 +738,7 @@ echo "=== Test Results Directory Structure ===" &&
 find . -name "*test*" -type d 2>/dev/null | head -10 &&
 find . -name "*.xml" -type f 2>/dev/null | head -10
 """
-        ]
+        docker_cmd = self._docker_bash_cmd(repo_dir, test_script, self._TEST_RUN_ARGS)
         
         print(f"Running Docker tests for {label} (commit: {commit_sha[:8]})")
         
@@ -675,44 +780,27 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
             "skipped_tests": 0
         }
         
-        # Method 1: Parse XML content directly from output
-        xml_pattern = r'<testcase[^>]+name="([^"]+)"[^>]+classname="([^"]+)"[^>]*(?:/>|>.*?</testcase>)'
-        xml_matches = re.findall(xml_pattern, test_output, re.DOTALL)
+        # Method 1: Parse the JUnit XML reports echoed into the output
+        sections = [content for _, content in self._XML_SECTION_RE.findall(test_output)]
+        if not sections:
+            sections = [test_output]
         
-        for match in xml_matches:
-            test_name = match[0].strip()
-            class_name = match[1].strip()
-            
-            # Check if this test case has failure/error tags
-            test_case_xml = re.search(
-                rf'<testcase[^>]+name="{re.escape(test_name)}"[^>]+classname="{re.escape(class_name)}"[^>]*>.*?</testcase>',
-                test_output, re.DOTALL
-            )
-            
-            status = "PASSED"  # Default
-            if test_case_xml:
-                test_xml_content = test_case_xml.group(0)
-                if '<failure' in test_xml_content:
-                    status = "FAILED"
-                elif '<error' in test_xml_content:
-                    status = "ERROR"
-                elif '<skipped' in test_xml_content:
-                    status = "SKIPPED"
-            
-            # Format as ClassName::testMethodName  
-            full_test_name = f"{class_name}::{test_name}"
-            test_results[full_test_name] = status
-            
-            # Update statistics
-            stats["total_tests"] += 1
-            if status == "PASSED":
-                stats["passed_tests"] += 1
-            elif status == "FAILED":
-                stats["failed_tests"] += 1
-            elif status == "ERROR":
-                stats["error_tests"] += 1
-            elif status == "SKIPPED":
-                stats["skipped_tests"] += 1
+        for xml_content in sections:
+            for class_name, test_name, status in self._parse_testcases(xml_content):
+                # Format as ClassName::testMethodName  
+                full_test_name = f"{class_name}::{test_name}"
+                test_results[full_test_name] = status
+                
+                # Update statistics
+                stats["total_tests"] += 1
+                if status == "PASSED":
+                    stats["passed_tests"] += 1
+                elif status == "FAILED":
+                    stats["failed_tests"] += 1
+                elif status == "ERROR":
+                    stats["error_tests"] += 1
+                elif status == "SKIPPED":
+                    stats["skipped_tests"] += 1
         
         # Method 2: Look for test case lines in the format from our parsing script
         test_pattern = r'^\s*-\s+(.+?)\s+\(([^)]+)\)(?:\s+-\s+(FAILED|ERROR|SKIPPED))?'
@@ -756,6 +844,48 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
         
         return test_results, stats
     
+    def _parse_testcases(self, xml_content: str) -> List[Tuple[str, str, str]]:
+        """Return (class_name, test_name, status) for each <testcase> in a report."""
+        testcases = []
+        try:
+            source = io.BytesIO(xml_content.strip().encode('utf-8'))
+            for _, elem in XMLTree.iterparse(source, events=('end',)):
+                if elem.tag != 'testcase':
+                    continue
+                test_name = (elem.get('name') or '').strip()
+                class_name = (elem.get('classname') or '').strip()
+                if test_name and class_name:
+                    child_tags = {child.tag for child in elem}
+                    testcases.append((class_name, test_name, self._testcase_status(child_tags)))
+                elem.clear()
+            return testcases
+        except XMLTree.ParseError:
+            pass
+        
+        # Not well-formed (truncated output, or no report sections); scan the text instead
+        testcases = []
+        for match in self._TESTCASE_RE.finditer(xml_content):
+            attrs = dict(self._ATTR_RE.findall(match.group(1)))
+            test_name = attrs.get('name', '').strip()
+            class_name = attrs.get('classname', '').strip()
+            if not test_name or not class_name:
+                continue
+            body = match.group(2) or ''
+            child_tags = {tag for tag in ('failure', 'error', 'skipped') if f'<{tag}' in body}
+            testcases.append((class_name, test_name, self._testcase_status(child_tags)))
+        return testcases
+    
+    @staticmethod
+    def _testcase_status(child_tags) -> str:
+        """Status of a testcase given its child tags; failure outranks error and skipped."""
+        if 'failure' in child_tags:
+            return "FAILED"
+        if 'error' in child_tags:
+            return "ERROR"
+        if 'skipped' in child_tags:
+            return "SKIPPED"
+        return "PASSED"
+    
     def apply_patch(self, repo_dir: Path, patch_content: str, test_patch_content: str = "") -> bool:
         """Apply patch and test_patch to the repository."""
         try:
@@ -796,40 +926,34 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
             print(f"Error applying patches: {e}")
             return False
     
-    def cleanup_repo(self, repo_dir: Path):
-        """Clean up repository build artifacts and caches."""
+    def cleanup_repo(self, repo_dir: Path, docker_pass: bool = True):
+        """
+        Clean up repository build artifacts and caches.
+        
+        docker_pass=False skips the root cleanup container, for when a test
+        container already released its build outputs.
+        """
         print(f"Cleaning up repository: {repo_dir}")
         
-        # Use Docker to clean files with proper permissions FIRST
-        try:
-            docker_cmd_prefix = self._get_docker_cmd_prefix()
-            
-            # Clean as root inside Docker to handle root-owned files
-            cleanup_cmd = docker_cmd_prefix + [
-                "run", "--rm",
-                "-v", f"{repo_dir.absolute()}:/project", 
-                self.docker_image,
-                "bash", "-c", """
-                cd /project && 
-                echo "Cleaning all build artifacts as root..." &&
-                find . -name "build" -type d -exec rm -rf {} + 2>/dev/null || true &&
-                find . -name ".gradle" -type d -exec rm -rf {} + 2>/dev/null || true &&
-                rm -rf build/ app/build/ */build/ .gradle/ 2>/dev/null || true &&
-                echo "Fixing ownership of remaining files..." &&
-                chown -R $(stat -c '%u:%g' /project) . 2>/dev/null || chown -R 1000:1000 . 2>/dev/null || true &&
-                chmod -R u+rwX . 2>/dev/null || true &&
-                echo "Docker cleanup completed"
-                """
-            ]
-            
-            result = subprocess.run(cleanup_cmd, capture_output=True, text=True, timeout=300)
-            if result.returncode != 0:
-                print(f"Docker cleanup warning: {result.stderr}")
-            else:
-                print("Docker cleanup completed successfully")
+        # Use Docker to clean files with proper permissions FIRST,
+        # unless the test container already did so on its way out
+        if docker_pass:
+            try:
+                # Clean as root inside Docker to handle root-owned files
+                cleanup_cmd = self._docker_bash_cmd(repo_dir, f"""
+                    echo "Cleaning all build artifacts as root..." &&
+                    {self._RELEASE_BUILD_OUTPUTS} &&
+                    echo "Docker cleanup completed"
+                    """)
                 
-        except Exception as e:
-            print(f"Docker cleanup failed: {e}")
+                result = subprocess.run(cleanup_cmd, capture_output=True, text=True, timeout=300)
+                if result.returncode != 0:
+                    print(f"Docker cleanup warning: {result.stderr}")
+                else:
+                    print("Docker cleanup completed successfully")
+                    
+            except Exception as e:
+                print(f"Docker cleanup failed: {e}")
         
         # Second pass: Git cleanup with better error handling
         try:
@@ -898,6 +1022,9 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
             print(f"Repository directory is not a valid git repository: {repo_dir.absolute()}")
             return None
         
+        # Set once a test container has finished and released its build outputs
+        outputs_released = False
+        
         try:
             # Setup user.properties for projects that need it (like Bitwarden)
             # self.setup_user_properties(repo_dir)
@@ -915,10 +1042,11 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
             if not base_results:
                 print("No test results from base commit")
                 return None
+            outputs_released = True
             
             # Apply patches and test
             print("\n--- Applying patches and testing ---")
-            self.cleanup_repo(repo_dir)
+            self.cleanup_repo(repo_dir, docker_pass=False)
             
             # Force checkout base commit again with aggressive cleanup
             try:
@@ -940,11 +1068,13 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
                 print("Failed to apply patches")
                 return None
             
+            outputs_released = False
             gold_results, gold_stats = self.run_docker_tests(repo_dir, "HEAD", java_version, "patched")
             
             if not gold_results:
                 print("No test results from patched version")
                 return None
+            outputs_released = True
             
             # Generate expectations
             fail_to_pass = []
@@ -1004,7 +1134,7 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
         finally:
             # Cleanup
             try:
-                self.cleanup_repo(repo_dir)
+                self.cleanup_repo(repo_dir, docker_pass=not outputs_released)
             except Exception as e:
                 print(f"Error during cleanup: {e}")
     
@@ -1012,6 +1142,7 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
         """Process JSONL file and generate results."""
         self.setup_workspace()
         self.ensure_docker_image()
+        self.start_worker_container()
         
         results = []
         
@@ -1040,6 +1171,7 @@ find . -name "*.xml" -type f 2>/dev/null | head -10
                         print(f"Error processing line {line_num}: {e}")
         
         finally:
+            self.stop_worker_container()
             self.cleanup_workspace()
         
         print(f"\nProcessing complete! Generated {len(results)} results in {output_file}")
@@ -3,17 +3,27 @@
 Parallel test execution strategy for Android validation.
 """
 
+import io
 import re
 import json
 import logging
+import sys
 import time
+from collections import Counter
 from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+
+try:
+    from lxml import etree as XMLTree
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as XMLTree
+    LXML_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     """Represents a single test result."""
     test_name: str
@@ -22,20 +32,30 @@ class TestResult:
     duration: float = 0.0
     failure_message: str = ""
     error_message: str = ""
+    # "<class_name>.<test_name>", built once and interned; used as the test's key
+    full_name: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.full_name = sys.intern(f"{self.class_name}.{self.test_name}")
     
     def to_dict(self) -> dict:
         """Convert TestResult to dictionary for JSON serialization."""
-        return {
-            'test_name': self.test_name,
-            'class_name': self.class_name,
-            'status': self.status,
-            'duration': self.duration,
-            'failure_message': self.failure_message,
-            'error_message': self.error_message
-        }
+        return _test_result_to_dict(self)
+
+
+def _test_result_to_dict(test: TestResult) -> dict:
+    """Serializable view of a single test result."""
+    return {
+        'test_name': test.test_name,
+        'class_name': test.class_name,
+        'status': test.status,
+        'duration': test.duration,
+        'failure_message': test.failure_message,
+        'error_message': test.error_message
+    }
 
 
-@dataclass
+@dataclass(slots=True)
 class TestExecutionResult:
     """Represents complete test execution results."""
     total_tests: int
@@ -52,16 +72,8 @@ class TestExecutionResult:
     
     def to_dict(self) -> dict:
         """Convert TestExecutionResult to dictionary for JSON serialization."""
-        result = {}
-        for key, value in self.__dict__.items():
-            if hasattr(value, 'to_dict'):
-                result[key] = value.to_dict()
-            elif isinstance(value, list):
-                result[key] = [item.to_dict() if hasattr(item, 'to_dict') else item for item in value]
-            elif value is not None:
-                result[key] = value
-            else:
-                result[key] = None
+        result = {f.name: getattr(self, f.name) for f in fields(self)}
+        result['test_results'] = [_test_result_to_dict(test) for test in self.test_results]
         return result
 
 
@@ -558,16 +570,12 @@ echo "=== Test execution completed ===" &&
 echo "Exit code: $GRADLE_EXIT_CODE" &&
 
 echo "=== Collecting test results ===" &&
-find . -name "TEST-*.xml" -type f 2>/dev/null | head -30 | while read file; do
+# One walk for both report layouts, skipping trees that never hold reports
+find . \\( -name .git -o -name .gradle -o -name node_modules \\) -prune -o \\
+    -type f \\( -name "TEST-*.xml" -o -path "*/test-results/*" -name "*.xml" \\) -print 2>/dev/null | head -60 | while read file; do
     echo "=== XML FILE: $file ===" 
     cat "$file" 2>/dev/null || echo "Could not read $file"
     echo "=== END XML FILE ==="
-done &&
-
-find . -path "*/test-results/*" -name "*.xml" -type f 2>/dev/null | head -30 | while read file; do
-    echo "=== TEST RESULT: $file ===" 
-    cat "$file" 2>/dev/null || echo "Could not read $file"
-    echo "=== END TEST RESULT ==="
 done
 """
         
@@ -800,16 +808,12 @@ else
 fi
 
 echo "=== Collecting test results ===" &&
-find . -name "TEST-*.xml" -type f 2>/dev/null | head -30 | while read file; do
+# One walk for both report layouts, skipping trees that never hold reports
+find . \\( -name .git -o -name .gradle -o -name node_modules \\) -prune -o \\
+    -type f \\( -name "TEST-*.xml" -o -path "*/test-results/*" -name "*.xml" \\) -print 2>/dev/null | head -60 | while read file; do
     echo "=== XML FILE: $file ===" 
     cat "$file" 2>/dev/null || echo "Could not read $file"
     echo "=== END XML FILE ==="
-done &&
-
-find . -path "*/test-results/*" -name "*.xml" -type f 2>/dev/null | head -30 | while read file; do
-    echo "=== TEST RESULT: $file ===" 
-    cat "$file" 2>/dev/null || echo "Could not read $file"
-    echo "=== END TEST RESULT ==="
 done
 """
         
@@ -972,7 +976,7 @@ done
             # Deduplicate tests based on class + method combination
             for test in parsed_tests:
                 # Create unique identifier for each test
-                test_key = f"{test.class_name}.{test.test_name}"
+                test_key = test.full_name
                 
                 if test_key not in seen_tests:
                     seen_tests.add(test_key)
@@ -985,7 +989,64 @@ done
         return test_results
     
     def _parse_xml_content(self, xml_content: str) -> List[TestResult]:
-        """Parse XML test results."""
+        """Parse a JUnit XML report, streaming one <testcase> at a time."""
+        test_results = []
+        source = io.BytesIO(xml_content.encode('utf-8'))
+        
+        try:
+            for _, elem in XMLTree.iterparse(source, events=('end',)):
+                if elem.tag != 'testcase':
+                    continue
+                test = self._parse_testcase_element(elem)
+                if test:
+                    test_results.append(test)
+                # Drop the finished subtree so memory stays flat on large reports
+                elem.clear()
+        except XMLTree.ParseError as e:
+            # Truncated or interleaved report output; fall back to the tolerant regex scan
+            logger.debug(f"XML parse failed, falling back to regex scan: {e}")
+            return self._parse_xml_content_regex(xml_content)
+        
+        return test_results
+    
+    def _parse_testcase_element(self, elem) -> Optional[TestResult]:
+        """Build a TestResult from a <testcase> element."""
+        attrib = elem.attrib
+        test_name = (attrib.get('name') or '').strip()
+        class_name = (attrib.get('classname') or '').strip()
+        if not test_name or not class_name:
+            return None
+        
+        time_attr = attrib.get('time')
+        try:
+            duration = float(time_attr) if time_attr else 0.0
+        except ValueError:
+            duration = 0.0
+        
+        status = "PASSED"
+        failure_msg = error_msg = ""
+        
+        # One pass over the children; failure outranks error, which outranks skipped
+        for child in elem:
+            tag = child.tag
+            if tag == 'failure':
+                status = "FAILED"
+                failure_msg = (child.text or '').strip()
+                error_msg = ""
+                break
+            elif tag == 'error' and status != "ERROR":
+                status = "ERROR"
+                error_msg = (child.text or '').strip()
+            elif tag == 'skipped' and status == "PASSED":
+                status = "SKIPPED"
+        
+        return TestResult(
+            test_name=test_name, class_name=class_name, status=status,
+            duration=duration, failure_message=failure_msg, error_message=error_msg
+        )
+    
+    def _parse_xml_content_regex(self, xml_content: str) -> List[TestResult]:
+        """Regex-based fallback for XML that does not parse cleanly."""
         test_results = []
         testcase_pattern = r'<testcase[^>]*name="([^"]+)"[^>]*classname="([^"]+)"[^>]*(?:time="([^"]*)")?[^>]*(?:/>|>(.*?)</testcase>)'
         testcases = re.findall(testcase_pattern, xml_content, re.DOTALL)
@@ -1024,10 +1085,11 @@ done
                                duration: float, gradle_command: str = "") -> TestExecutionResult:
         """Create execution result summary."""
         total_tests = len(test_results)
-        passed = len([t for t in test_results if t.status == 'PASSED'])
-        failed = len([t for t in test_results if t.status == 'FAILED'])
-        skipped = len([t for t in test_results if t.status == 'SKIPPED'])
-        errors = len([t for t in test_results if t.status == 'ERROR'])
+        status_counts = Counter(t.status for t in test_results)
+        passed = status_counts['PASSED']
+        failed = status_counts['FAILED']
+        skipped = status_counts['SKIPPED']
+        errors = status_counts['ERROR']
         
         build_successful = ('BUILD SUCCESSFUL' in raw_output or 
                           ('BUILD FAILED' not in raw_output and exit_code == 0))
@@ -1043,30 +1105,22 @@ done
     def compare_test_results(self, pre_results: TestExecutionResult, 
                            post_results: TestExecutionResult) -> Dict[str, List[str]]:
         """Compare test results (same as original)."""
-        pre_tests = {f"{t.class_name}.{t.test_name}": t.status 
+        pre_tests = {t.full_name: t.status 
                     for t in pre_results.test_results}
-        post_tests = {f"{t.class_name}.{t.test_name}": t.status 
+        post_tests = {t.full_name: t.status 
                      for t in post_results.test_results}
         
-        fail_to_pass = []
-        pass_to_pass = []
-        pass_to_fail = []
-        fail_to_fail = []
-        
-        all_tests = set(pre_tests.keys()) | set(post_tests.keys())
-        
-        for test_name in all_tests:
-            pre_status = pre_tests.get(test_name, 'NOT_FOUND')
-            post_status = post_tests.get(test_name, 'NOT_FOUND')
-            
-            if pre_status in ['FAILED', 'ERROR'] and post_status == 'PASSED':
-                fail_to_pass.append(test_name)
-            elif pre_status == 'PASSED' and post_status == 'PASSED':
-                pass_to_pass.append(test_name)
-            elif pre_status == 'PASSED' and post_status in ['FAILED', 'ERROR']:
-                pass_to_fail.append(test_name)
-            elif pre_status in ['FAILED', 'ERROR'] and post_status in ['FAILED', 'ERROR']:
-                fail_to_fail.append(test_name)
+        failing = ('FAILED', 'ERROR')
+        pre_pass = {name for name, status in pre_tests.items() if status == 'PASSED'}
+        pre_fail = {name for name, status in pre_tests.items() if status in failing}
+        post_pass = {name for name, status in post_tests.items() if status == 'PASSED'}
+        post_fail = {name for name, status in post_tests.items() if status in failing}
+        
+        # Tests missing from either phase fall out of every intersection
+        fail_to_pass = list(pre_fail & post_pass)
+        pass_to_pass = list(pre_pass & post_pass)
+        pass_to_fail = list(pre_pass & post_fail)
+        fail_to_fail = list(pre_fail & post_fail)
         
         return {
             'fail_to_pass': fail_to_pass,
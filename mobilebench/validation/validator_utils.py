@@ -17,7 +17,7 @@ import shutil
 import subprocess
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, is_dataclass
 
 # Import optimized modules
 from config import AndroidConfig
@@ -27,6 +27,52 @@ from testing import AndroidTestingParallel, TestExecutionResult
 from build_utils import run_build_step, BuildResult
 from stub_generator_utils import generate_and_apply_stubs, StubGenerationResult
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# JSON (array) datasets larger than this are parsed incrementally when ijson is installed
+STREAM_JSON_THRESHOLD = 64 * 1024 * 1024
+
+
+def _json_default(obj):
+    """
+    Encoder hook for dataclasses nested in results.
+    
+    A dataclass's own to_dict() wins, so derived fields such as
+    TestResult.full_name stay out of the saved JSON; other dataclasses are
+    encoded field by field, with nested values passed back through here.
+    """
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_indented(obj) -> bytes:
+    """
+    Two-space indented JSON as bytes.
+    
+    Result objects can be passed as-is; dataclasses are encoded through
+    _json_default with either encoder.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=_json_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+    return json.dumps(obj, indent=2, default=_json_default).encode('utf-8')
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -60,6 +106,24 @@ if not HYBRID_STUBBER_AVAILABLE:
 STUBBING_AVAILABLE = HYBRID_STUBBER_AVAILABLE or AST_AVAILABLE
 
 
+_FAILING_STATUSES = frozenset(('FAILED', 'ERROR'))
+
+
+def _index_test_results(test_results) -> Tuple[Dict[str, str], List[str], List[str]]:
+    """Map test names to statuses and list passed and failed names in one pass."""
+    statuses = {}
+    passed = []
+    failed = []
+    for t in test_results:
+        name = t.full_name
+        statuses[name] = t.status
+        if t.status == 'PASSED':
+            passed.append(name)
+        elif t.status in _FAILING_STATUSES:
+            failed.append(name)
+    return statuses, passed, failed
+
+
 @dataclass
 class ValidationResult:
     """Validation result with test transitions only."""
@@ -128,41 +192,26 @@ class ValidationResult:
             logger.warning(f"Missing test execution results for {self.instance_id}")
             return
         
-        # Extract test results and create test status mappings
-        pre_tests = {
-            f"{t.class_name}.{t.test_name}": t.status 
-            for t in self.pre_test_execution.test_results
-        }
-        post_tests = {
-            f"{t.class_name}.{t.test_name}": t.status 
-            for t in self.post_test_execution.test_results
-        }
-        
-        # Find all tests that appear in either pre or post execution
-        all_tests = set(pre_tests.keys()) | set(post_tests.keys())
+        # Index each phase in one pass: name -> status, plus passed/failed name lists
+        pre_tests, self.pre_passed_tests, self.pre_failed_tests = _index_test_results(
+            self.pre_test_execution.test_results
+        )
+        post_tests, self.post_passed_tests, self.post_failed_tests = _index_test_results(
+            self.post_test_execution.test_results
+        )
         
-        # Reset transition lists
-        self.fail_to_pass_tests = []
-        self.pass_to_pass_tests = []
-        self.pass_to_fail_tests = []
-        self.fail_to_fail_tests = []
+        pre_pass = {name for name, status in pre_tests.items() if status == 'PASSED'}
+        pre_fail = {name for name, status in pre_tests.items() if status in _FAILING_STATUSES}
+        post_pass = {name for name, status in post_tests.items() if status == 'PASSED'}
+        post_fail = {name for name, status in post_tests.items() if status in _FAILING_STATUSES}
         
-        # Compute transitions for each test
-        for test_name in all_tests:
-            pre_status = pre_tests.get(test_name, 'NOT_FOUND')
-            post_status = post_tests.get(test_name, 'NOT_FOUND')
-            
-            # Classify test transitions
-            if pre_status in ['FAILED', 'ERROR'] and post_status == 'PASSED':
-                self.fail_to_pass_tests.append(test_name)
-            elif pre_status == 'PASSED' and post_status == 'PASSED':
-                self.pass_to_pass_tests.append(test_name)
-            elif pre_status == 'PASSED' and post_status in ['FAILED', 'ERROR']:
-                self.pass_to_fail_tests.append(test_name)
-            elif pre_status in ['FAILED', 'ERROR'] and post_status in ['FAILED', 'ERROR']:
-                self.fail_to_fail_tests.append(test_name)
-            # Note: We ignore tests that are NOT_FOUND in one phase as they may be 
-            # new tests introduced by patches or environment-specific
+        # Classify transitions with set intersections. Tests NOT_FOUND in one phase
+        # are ignored, as they may be new tests introduced by patches or
+        # environment-specific
+        self.fail_to_pass_tests = list(pre_fail & post_pass)
+        self.pass_to_pass_tests = list(pre_pass & post_pass)
+        self.pass_to_fail_tests = list(pre_pass & post_fail)
+        self.fail_to_fail_tests = list(pre_fail & post_fail)
         
         # Update counts
         self.fail_to_pass_count = len(self.fail_to_pass_tests)
@@ -170,28 +219,6 @@ class ValidationResult:
         self.pass_to_fail_count = len(self.pass_to_fail_tests)
         self.fail_to_fail_count = len(self.fail_to_fail_tests)
         
-        # Extract passed/failed test lists for each phase
-        self.pre_passed_tests = [
-            f"{t.class_name}.{t.test_name}" 
-            for t in self.pre_test_execution.test_results 
-            if t.status == 'PASSED'
-        ]
-        self.pre_failed_tests = [
-            f"{t.class_name}.{t.test_name}" 
-            for t in self.pre_test_execution.test_results 
-            if t.status in ['FAILED', 'ERROR']
-        ]
-        self.post_passed_tests = [
-            f"{t.class_name}.{t.test_name}" 
-            for t in self.post_test_execution.test_results 
-            if t.status == 'PASSED'
-        ]
-        self.post_failed_tests = [
-            f"{t.class_name}.{t.test_name}" 
-            for t in self.post_test_execution.test_results 
-            if t.status in ['FAILED', 'ERROR']
-        ]
-        
         logger.info(f"Test transitions for {self.instance_id}:")
         logger.info(f"  Fail→Pass: {self.fail_to_pass_count}")
         logger.info(f"  Pass→Pass: {self.pass_to_pass_count}")
@@ -1112,16 +1139,16 @@ echo "WordPress setup in {workspace_name} completed successfully"
     
     def _load_dataset(self, dataset_file: str) -> list:
         """Load dataset from JSON or JSONL file."""
-        instances = []
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
         
-        with open(dataset_file, 'r', encoding='utf-8') as f:
+        with open(dataset_file, 'rb') as f:
             if dataset_file.endswith('.jsonl'):
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        instances.append(json.loads(line))
+                instances = [loads(line) for line in f if line.strip()]
+            elif IJSON_AVAILABLE and os.fstat(f.fileno()).st_size > STREAM_JSON_THRESHOLD:
+                # Avoid holding the raw file and the parsed array in memory at once
+                instances = list(ijson.items(f, 'item', use_float=True))
             else:
-                instances = json.load(f)
+                instances = loads(f.read())
         
         logger.info(f"Loaded {len(instances)} instances from {dataset_file}")
         return instances
@@ -1151,8 +1178,11 @@ echo "WordPress setup in {workspace_name} completed successfully"
                 except Exception:
                     pass
             
-            # Clone repository
-            clone_cmd = ["git", "clone", "--recursive", "--depth", "1000", clone_url, temp_dir]
+            # Clone repository; blobless so only the checked-out commits' files are downloaded
+            clone_cmd = [
+                "git", "clone", "--filter=blob:none", "--no-tags",
+                "--recurse-submodules", "--shallow-submodules", clone_url, temp_dir
+            ]
             result = subprocess.run(clone_cmd, capture_output=True, text=True, timeout=600)
             
             if result.returncode != 0:
@@ -1193,8 +1223,8 @@ echo "WordPress setup in {workspace_name} completed successfully"
             
             logger.info(f"Cloning fresh {repo} to {temp_dir} for post-solution tests")
             
-            # Clone repository
-            clone_cmd = ["git", "clone", "--recursive", "--depth", "1000", clone_url, temp_dir]
+            # Clone repository; submodules are deinitialized below, so skip fetching them
+            clone_cmd = ["git", "clone", "--filter=blob:none", "--no-tags", clone_url, temp_dir]
             result = subprocess.run(clone_cmd, capture_output=True, text=True, timeout=600)
             
             if result.returncode != 0:
@@ -1216,8 +1246,8 @@ echo "WordPress setup in {workspace_name} completed successfully"
             result = subprocess.run(checkout_cmd, cwd=temp_dir, capture_output=True, text=True, timeout=120)
             
             if result.returncode != 0:
-                # Try fetching more commits if shallow clone doesn't have the commit
-                fetch_cmd = ["git", "fetch", "--unshallow"]
+                # The commit may not be on a branch (e.g. only reachable from a PR ref)
+                fetch_cmd = ["git", "fetch", "origin", base_commit]
                 fetch_result = subprocess.run(fetch_cmd, cwd=temp_dir, capture_output=True, text=True, timeout=300)
                 
                 if fetch_result.returncode == 0:
@@ -1287,8 +1317,8 @@ echo "WordPress setup in {workspace_name} completed successfully"
         instance_dir.mkdir(exist_ok=True, parents=True)
         
         result_file = instance_dir / "validation_result.json"
-        with open(result_file, 'w') as f:
-            json.dump(result.to_dict(), f, indent=2)
+        with open(result_file, 'wb') as f:
+            f.write(_dumps_indented(result))
     
     def _save_test_logs(self, instance_id: str, phase: str, logs: str):
         """Save test execution logs."""
@@ -1323,7 +1353,7 @@ echo "WordPress setup in {workspace_name} completed successfully"
                 {
                     'test_name': test.test_name,
                     'class_name': test.class_name,
-                    'full_name': f"{test.class_name}.{test.test_name}",
+                    'full_name': test.full_name,
                     'status': test.status,
                     'duration': test.duration,
                     'failure_message': test.failure_message,
@@ -1331,14 +1361,14 @@ echo "WordPress setup in {workspace_name} completed successfully"
                 }
                 for test in test_results.test_results
             ],
-            'passed_tests': [f"{t.class_name}.{t.test_name}" for t in test_results.test_results if t.status == 'PASSED'],
-            'failed_tests': [f"{t.class_name}.{t.test_name}" for t in test_results.test_results if t.status in ['FAILED', 'ERROR']],
-            'skipped_tests': [f"{t.class_name}.{t.test_name}" for t in test_results.test_results if t.status == 'SKIPPED']
+            'passed_tests': [t.full_name for t in test_results.test_results if t.status == 'PASSED'],
+            'failed_tests': [t.full_name for t in test_results.test_results if t.status in ['FAILED', 'ERROR']],
+            'skipped_tests': [t.full_name for t in test_results.test_results if t.status == 'SKIPPED']
         }
         
         results_file = instance_dir / f"test_results_{phase}.json"
-        with open(results_file, 'w') as f:
-            json.dump(results_data, f, indent=2)
+        with open(results_file, 'wb') as f:
+            f.write(_dumps_indented(results_data))
         
         logger.info(f"Saved {phase} test results to {results_file}")
         logger.info(f"  {test_results.passed} passed, {test_results.failed} failed, {test_results.skipped} skipped tests")
@@ -1373,39 +1403,44 @@ echo "WordPress setup in {workspace_name} completed successfully"
 
     def _save_final_results(self, results: Dict[str, ValidationResult], output_dir: Path):
         """Save final summary results with test transitions only."""
-        successful = [r for r in results.values() if r.success]
-        failed = [r for r in results.values() if not r.success]
-        
-        # Calculate aggregate test statistics (only test transitions)
-        total_fail_to_pass = sum(r.fail_to_pass_count for r in successful)
-        total_pass_to_pass = sum(r.pass_to_pass_count for r in successful)
-        total_pass_to_fail = sum(r.pass_to_fail_count for r in successful)
-        total_fail_to_fail = sum(r.fail_to_fail_count for r in successful)
-        
-        # Calculate test statistics
+        # Aggregate test transitions, tests seen and durations in a single pass
+        n_successful = 0
+        total_fail_to_pass = 0
+        total_pass_to_pass = 0
+        total_pass_to_fail = 0
+        total_fail_to_fail = 0
         all_tests_found = set()
-        for result in successful:
+        total_duration = 0
+        for result in results.values():
+            if not result.success:
+                continue
+            n_successful += 1
+            total_fail_to_pass += result.fail_to_pass_count
+            total_pass_to_pass += result.pass_to_pass_count
+            total_pass_to_fail += result.pass_to_fail_count
+            total_fail_to_fail += result.fail_to_fail_count
             all_tests_found.update(result.pre_passed_tests)
             all_tests_found.update(result.pre_failed_tests)
             all_tests_found.update(result.post_passed_tests)
             all_tests_found.update(result.post_failed_tests)
+            if result.total_duration > 0:
+                total_duration += result.total_duration
         
-        # Calculate durations
-        total_duration = sum(r.total_duration for r in successful if r.total_duration > 0)
-        avg_duration = total_duration / len(successful) if successful else 0
+        n_failed = len(results) - n_successful
+        avg_duration = total_duration / n_successful if n_successful else 0
         
         # Create comprehensive summary
         summary = {
             'validation_metadata': {
                 'completion_time': datetime.now().isoformat(),
                 'total_duration_hours': total_duration / 3600,
-                'execution_summary': f"Completed {len(successful)}/{len(results)} instances successfully"
+                'execution_summary': f"Completed {n_successful}/{len(results)} instances successfully"
             },
             'overall_statistics': {
                 'total_instances': len(results),
-                'successful': len(successful),
-                'failed': len(failed),
-                'success_rate': len(successful) / len(results) if results else 0
+                'successful': n_successful,
+                'failed': n_failed,
+                'success_rate': n_successful / len(results) if results else 0
             },
             'test_transition_statistics': {
                 'fail_to_pass': total_fail_to_pass,
@@ -1426,8 +1461,8 @@ echo "WordPress setup in {workspace_name} completed successfully"
         
         # Save summary
         summary_file = output_dir / "final_validation_summary.json"
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        with open(summary_file, 'wb') as f:
+            f.write(_dumps_indented(summary))
         
         logger.info(f"Saved final validation summary to {summary_file}")
 
@@ -1479,8 +1514,8 @@ def _save_test_analysis(instance_id: str, result: ValidationResult, output_dir:
     }
     
     analysis_file = instance_dir / "test_analysis.json"
-    with open(analysis_file, 'w') as f:
-        json.dump(analysis_data, f, indent=2)
+    with open(analysis_file, 'wb') as f:
+        f.write(_dumps_indented(analysis_data))
     
     logger.info(f"Saved test analysis to {analysis_file}")
 